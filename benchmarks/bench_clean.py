@@ -0,0 +1,58 @@
+"""
+Benchmark of the vectorized cleaning against the original row-wise one.
+
+For each size, a synthetic raw dataset is written to CSV and read back,
+cleaned by both implementations, and the two clean CSVs are compared byte
+for byte.
+
+Usage: python -m benchmarks.bench_clean [--rows 10000 100000 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+from benchmarks.legacy_clean import legacy_clean_dataframe
+from benchmarks.synthetic import raw_csv
+from scraper.cleaning import clean_dataframe
+
+
+def run(rows, seed=0):
+    with tempfile.TemporaryDirectory() as directory:
+        raw = raw_csv(os.path.join(directory, "raw.csv"), rows, seed)
+
+    start = time.perf_counter()
+    legacy = legacy_clean_dataframe(raw.copy())
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = clean_dataframe(raw.copy())
+    vectorized_time = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "clean_rows": len(vectorized),
+        "legacy_seconds": legacy_time,
+        "vectorized_seconds": vectorized_time,
+        "speedup": legacy_time / vectorized_time,
+        "identical": legacy.to_csv(index=False) == vectorized.to_csv(index=False),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cleaning of the raw dataset.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Dataset sizes")
+    args = parser.parse_args()
+
+    # Both implementations assign columns on filtered frames
+    warnings.simplefilter("ignore")
+    print(f"{'rows':>10} {'legacy (s)':>11} {'vectorized (s)':>15} {'speedup':>8} {'identical':>10}")
+    for rows in args.rows:
+        result = run(rows)
+        print(f"{result['rows']:>10} {result['legacy_seconds']:>11.2f} {result['vectorized_seconds']:>15.2f} "
+              f"{result['speedup']:>7.1f}x {str(result['identical']):>10}")
+
+
+if __name__ == "__main__":
+    main()
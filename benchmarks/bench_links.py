@@ -0,0 +1,52 @@
+"""
+Micro-benchmark of the search-page link extractors.
+
+Compares the BeautifulSoup extractor Immoweb_Scraper.extract_immoweb_urls
+used to run (benchmarks.legacy_links) with the single-pass
+scraper.links.extract_property_links on synthetic search pages, checks that
+both return the same URLs and reports pages per second.
+
+Usage: python -m benchmarks.bench_links [--pages N]
+"""
+import argparse
+import time
+
+from benchmarks.legacy_links import legacy_extract_links
+from benchmarks.synthetic import search_pages
+from scraper.links import extract_property_links
+
+
+def run(pages):
+    start = time.perf_counter()
+    legacy = [legacy_extract_links(content) for _, content in pages]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = [extract_property_links(content) for _, content in pages]
+    fast_time = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(legacy, fast))
+    return {
+        "pages": len(pages),
+        "bs4_pages_per_sec": len(pages) / legacy_time,
+        "lxml_pages_per_sec": len(pages) / fast_time,
+        "speedup": legacy_time / fast_time,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search-page link extractors.")
+    parser.add_argument("--pages", type=int, default=500, help="Number of synthetic pages")
+    args = parser.parse_args()
+
+    result = run(search_pages(args.pages))
+    print(f"Pages:             {result['pages']}")
+    print(f"BeautifulSoup:     {result['bs4_pages_per_sec']:.1f} pages/sec")
+    print(f"lxml single pass:  {result['lxml_pages_per_sec']:.1f} pages/sec")
+    print(f"Speedup:           {result['speedup']:.1f}x")
+    print(f"Mismatching pages: {result['mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark of the multi-core cleaning against the single-core one.
+
+For each size, a synthetic raw dataset is written to CSV and read back,
+cleaned by clean_dataframe() and by clean_dataframe_parallel() with each
+number of processes, and every result is compared with the single-core one.
+
+Usage: python -m benchmarks.bench_parallel_clean [--rows 1000000] [--workers 2 4 8 16]
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+from benchmarks.synthetic import raw_csv
+from scraper.cleaning import clean_dataframe
+from scraper.parallel_cleaning import clean_dataframe_parallel
+
+
+def run(rows, workers, seed=0):
+    with tempfile.TemporaryDirectory() as directory:
+        raw = raw_csv(os.path.join(directory, "raw.csv"), rows, seed)
+
+    start = time.perf_counter()
+    single = clean_dataframe(raw.copy())
+    single_time = time.perf_counter() - start
+
+    results = []
+    for count in workers:
+        start = time.perf_counter()
+        parallel = clean_dataframe_parallel(raw.copy(), count)
+        parallel_time = time.perf_counter() - start
+        try:
+            pd.testing.assert_frame_equal(single, parallel, check_exact=True)
+            identical = True
+        except AssertionError:
+            identical = False
+        results.append({
+            "rows": rows,
+            "workers": count,
+            "single_seconds": single_time,
+            "parallel_seconds": parallel_time,
+            "speedup": single_time / parallel_time,
+            "identical": identical,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-core cleaning of the raw dataset.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000], help="Dataset sizes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16], help="Numbers of processes")
+    args = parser.parse_args()
+
+    # Both implementations assign columns on filtered frames
+    warnings.simplefilter("ignore")
+    print(f"{'rows':>10} {'workers':>8} {'single (s)':>11} {'parallel (s)':>13} {'speedup':>8} {'identical':>10}")
+    for rows in args.rows:
+        for result in run(rows, args.workers):
+            print(f"{result['rows']:>10} {result['workers']:>8} {result['single_seconds']:>11.2f} "
+                  f"{result['parallel_seconds']:>13.2f} {result['speedup']:>7.1f}x {str(result['identical']):>10}")
+
+
+if __name__ == "__main__":
+    main()
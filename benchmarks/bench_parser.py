@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of the detail-page parsers.
+
+Compares the BeautifulSoup based Immoweb_Scraper.process_url with the lxml
+one-pass scraper.parser.parse_classified on synthetic classified pages, checks
+that both produce the same records and reports pages per second. With
+--payload, the pages embed a window.classified JSON payload and
+parse_classified also runs with use_payload, as Immoweb_Scraper(use_payload=True)
+does, filling the fields missing from the tables.
+
+Usage: python -m benchmarks.bench_parser [--pages N] [--payload]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic import classified_pages
+from scraper.parser import parse_classified
+from scraper.scraper import Immoweb_Scraper
+
+
+def run(pages):
+    scraper = Immoweb_Scraper(1, connect=False)
+
+    start = time.perf_counter()
+    # process_url prints every URL
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy = [scraper.process_url(url, BeautifulSoup(content, "lxml")) for url, content in pages]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = [parse_classified(url, content, scraper.element_list) for url, content in pages]
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with_payload = [parse_classified(url, content, scraper.element_list, use_payload=True) for url, content in pages]
+    payload_time = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(legacy, fast))
+    # The payload only adds fields, the ones read from the tables are unchanged
+    payload_mismatches = sum(any(record.get(key) != value for key, value in table.items())
+                             for table, record in zip(fast, with_payload))
+    return {
+        "pages": len(pages),
+        "bs4_pages_per_sec": len(pages) / legacy_time,
+        "lxml_pages_per_sec": len(pages) / fast_time,
+        "payload_pages_per_sec": len(pages) / payload_time,
+        "speedup": legacy_time / fast_time,
+        "mismatches": mismatches + payload_mismatches,
+        "payload_fields": sum(len(record) - len(table) for table, record in zip(fast, with_payload)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the detail-page parsers.")
+    parser.add_argument("--pages", type=int, default=500, help="Number of synthetic pages")
+    parser.add_argument("--payload", action="store_true", help="Embed a JSON payload in the pages")
+    args = parser.parse_args()
+
+    result = run(classified_pages(args.pages, with_payload=args.payload))
+    print(f"Pages:            {result['pages']}")
+    print(f"BeautifulSoup:    {result['bs4_pages_per_sec']:.1f} pages/sec")
+    print(f"lxml one-pass:    {result['lxml_pages_per_sec']:.1f} pages/sec")
+    print(f"lxml + payload:   {result['payload_pages_per_sec']:.1f} pages/sec")
+    print(f"Speedup:          {result['speedup']:.1f}x")
+    print(f"Payload fields:   {result['payload_fields']}")
+    print(f"Mismatching rows: {result['mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
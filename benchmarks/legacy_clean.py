@@ -0,0 +1,349 @@
+"""
+Reference row-wise implementation of the cleaning, as Clean_DataFrame was
+written before scraper.cleaning. Only used to check that the vectorized
+cleaning gives byte-identical output and to measure the speedup.
+"""
+import re
+
+import pandas as pd
+
+
+def legacy_clean_dataframe(df):
+    #drop duplicate based of property id
+    if 'Property ID' in df.columns:
+        df = df.drop_duplicates(subset=['Property ID'])
+    else:
+        print("Warning: 'Property ID' column not found. Skipping duplicate removal.")
+
+
+
+    # suppress wrong postal code
+    if 'Postal code' in df.columns:
+        condition_to_delete = df['Postal code'].astype(str).str.len() < 5
+        #condition_to_delete = ((df['Postal code'].str.contains('%')) | (len(df['Postal code']) > 4))
+        #condition_to_delete = (df['Postal code'].astype(str).str.isdigit()) | (df['Postal code'].astype(str).str.len() > 4)
+
+        df = df[~condition_to_delete]  # Keep rows where postal code length >= 5
+        df = df.reset_index(drop=True)
+    else:
+        print("Warning: 'Postal code' column not found. Skipping postal code filtering.")
+
+
+
+    # replacements of ugly pattern
+    if 'Locality name' in df.columns:
+        patterns_to_search = [re.escape('?'), '%C3%8B','%28','%29', '%27','%20', '%C3%A8', '%C3%8A', '%C3%AA', '%C3%88', '%C3%89', '%C3%A9', '%C3%A0', '%C3%A2', '%C3%82', '%C3%80','%C3%BB']
+        replacements = [' ', 'e','','',' ', ' ', 'e', 'e','e', 'e','e', 'e', 'a', 'a', 'a','a', 'u', ]
+        for pattern, replacement in zip(patterns_to_search, replacements):
+            condition_to_replace = df['Locality name'].str.contains(pattern, na=False)
+            df.loc[condition_to_replace, 'Locality name'] = df.loc[condition_to_replace, 'Locality name'].str.replace(pattern, replacement)
+    else:
+        print("Warning: 'Locality name' column not found. Skipping pattern replacement.")
+
+
+
+
+    #to convert the Price in a number format 
+    df["Price"] = df["Price"].astype(str).str.replace(",", "")
+
+
+
+    #to ensure that numeric to be column are containing numeric data
+    col_to_conv = [
+        "Property ID",
+        "Postal code",
+        "Open Fire",
+        "Price",
+        "Construction year",
+        "Number of frontages",
+        "Covered parking spaces",
+        "Outdoor parking spaces",
+        "Living area",
+        "Bedrooms",
+        "Bathrooms",
+        "Surface of the plot",
+        "Garden surface",
+        "Terrace surface",
+        "Shower rooms",
+    ]
+    for col in col_to_conv:
+        if col in df.columns:
+
+            df[col] = pd.to_numeric(df[col], downcast='integer', errors='coerce')
+
+
+    #appartment or house classification creation
+    df["Type of property"] = df[
+        "Subtype of property"
+    ].apply(
+        lambda x: None
+        if pd.isnull(x)
+        else (
+            "Apartment"
+            if x
+            in [
+                "apartment",
+                "loft",
+                "penthouse",
+                "duplex",
+                "ground-floor",
+                "flat-studio",
+                "service-flat",
+                "kot",
+                "triplex",
+            ]
+            else "House"
+        )
+    )
+
+
+    #New columns creation (arithmetic or spatial aggregation)
+    df["Parking tot nb"] = (df["Covered parking spaces"].fillna(0) + df["Outdoor parking spaces"].fillna(0))
+    df["Bathrooms total nb"] = (df["Bathrooms"].fillna(0) + df["Shower rooms"].fillna(0))
+
+    def province(dfval):
+        if pd.isna(dfval):
+            return None
+        postal_codes = [range(1000,1300), range(1300, 1500), range(1500,1990), range(3000,3500), range(2000,3000), range(3500,4000), range(4000,5000), range(5000,6000), range(6000,6600), range(7000,8000), range(6600,7000), range(8000,9000), range(9000,10000)]
+        provinces = ['Brussels Hoofdstedelijk Gewest', 'Waals-Brabant', 'Vlaams-Brabant', 'Vlaams-Brabant', 'Antwerpen', 'Limburg', 'Luik', 'Namen','Henegouwen', 'Henegouwen','Luxemburg', 'West-Vlaanderen', 'Oost-Vlaanderen']
+        for pc_range, prov in zip(postal_codes, provinces):
+            if dfval in pc_range:
+                return prov
+        return None
+    df['province'] = df['Postal code'].apply(lambda x: province(x))
+
+
+    def region(dfval):
+        if pd.isna(dfval):
+            return None
+        if dfval in range(1300,1500) or dfval in range(4000,7000):
+            return 'Wallonia'
+        elif dfval in range(1000,1300):
+            return 'Brussels'
+        else:
+            return 'Flanders'
+    df['region'] = df['Postal code'].apply(lambda x: region(x))
+
+
+    #quali>quanti transformatiion : to create boolean output for all columns where it is possibile 
+    #through direct converion (yes/no -0/1) or through aggregation 
+
+
+    df["New Construction boolean"] = df[
+        "Construction year"
+    ].apply(lambda x: None if pd.isnull(x) else (0 if x < 2021 else 1))
+
+    df["Tenement building boolean"] = df[
+        "Tenement building"
+    ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
+
+    df["Building condition boolean"] = df[
+        "Building condition"
+    ].apply(
+        lambda x: None
+        if pd.isnull(x)
+        else (1 if x in ["Asnew", "Good", "Justrenovated"] else 0)
+    )
+
+    df["Flood safe boolean"] = df[
+        "Flood zone type"
+    ].apply(lambda x: None if pd.isnull(x) else (1 if x == "Nonfloodzone" else 0))
+
+    df["Furnished boolean"] = df[
+        "Furnished"
+    ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
+
+
+    df["Kitchen equipped boolean"] = df[
+        "Kitchen type"
+    ].apply(
+        lambda x: None
+        if pd.isnull(x)
+        else (0 if x in ["Notinstalled", "USAuninstalled"] else 1)
+    )
+
+    df["Energy class boolean"] = df[
+        "Energy class"
+    ].apply(
+        lambda x: None
+        if pd.isnull(x) or x =='Notspecified'
+        else (1 if x in ["A", "A+","A++", "B"] else 0)
+    )
+    df["Terrace boolean"] = df["Terrace surface"].apply(
+        lambda x: 0 if pd.isnull(x) else (1 if x > 0 else 0)
+    )
+
+    df["Swimming pool boolean"] = df[
+        "Swimming pool"
+    ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
+
+    df["Garden boolean"] = df["Garden surface"].apply(
+        lambda x: 0 if pd.isnull(x) else (1 if x > 0 else 0)
+    )
+
+    df["Parking boolean"] = df["Parking tot nb"].apply(
+        lambda x: None if pd.isnull(x) else (1 if x > 0 else 0)
+    )
+
+    df["Bathrooms total nb boolean"] = df["Bathrooms total nb"].apply(
+        lambda x: None if pd.isnull(x) else (1 if x > 1 else 0)
+    )
+
+    df["Elevator boolean"] = df["Elevator"].apply(
+        lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0)
+    )
+
+    df["Accessible for disabled people boolean"] = df[
+        "Accessible for disabled people"
+    ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
+
+    df["Double glazing boolean"] = df[
+        "Double glazing"
+    ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
+
+
+     #text reformating in a more readable way 
+
+    replace_dict1 = {
+        "Asnew": "As new",
+        "Justrenovated": "Just renovated",
+        "Tobedoneup": "To be done",
+        "Torenovate": "To renovate",
+        "Torestore" : "To restore"
+    }
+    replace_dict2 = {
+        "Hyperequipped": "Hyper equipped",
+        "Semiequipped": "Semi equipped",
+        "USAhyperequipped": "USA hyper equipped",
+        "Notinstalled": "Not installed",
+        "USAinstalled": "USA installed",
+        "USAsemiequipped": "USA semi-equipped",
+        "USAuninstalled" : "USA uninstalled"
+    }
+    replace_dict3 = {"Fueloil": "Fuel oil"}
+
+    replace_dict4 = {
+        "Nonfloodzone": "Non flood zone",
+        "Circumscribedzone": "Circumscribed zone",
+        "Possiblecircumscribedwatersidezone": "Possible circumscribed waterside zone",
+        "Possiblefloodzone": "Possible flood zone",
+        "Recognizedfloodzone": "Recognized flood zone",
+        "Propertypartiallyorcompletelylocatedinacircumscribedandrecognizedfloodzone": "Property partially or completely located in a circumscribed and recognized flood zone",
+        "Propertypartiallyorcompletelylocatedinacircumscribedfloodzone" : "Property partially or completely located in a circumscribed flood zone",
+        "Propertypartiallyorcompletelylocatedinapossiblefloodzoneandlocatedinacircumscribedwatersidezone" : "Property partially or completely located in a possible flood zone and located in a circumscribed waterside zone", 
+}
+
+    replace_dict5 = {"Notspecified": "Not specified"}
+
+    df["Building condition"] = df[
+        "Building condition"
+    ].replace(replace_dict1)
+
+    df["Kitchen type"] = df["Kitchen type"].replace(
+        replace_dict2
+    )
+    df["Heating type"] = df["Heating type"].replace(
+        replace_dict3
+    )
+    df["Flood zone type"] = df["Flood zone type"].replace(
+        replace_dict4
+    )
+    df["Energy class"] = df["Energy class"].replace(
+        replace_dict5
+    )
+
+
+    # column renaming for clarity
+
+    df = df.rename(
+        columns={
+            "url": "URL",
+            "Price": "Price (euro)",
+            "Surface of the plot": "Plot surface (sqm)",
+            "Open Fire": "Open fire",
+            "Locality name": "Locality",
+            "Subtype of property": "Subtype",
+            "Living area": "Living surface (sqm)",
+            "Bedrooms": "Nb of Bedrooms",
+            "Terrace surface": "Terrace surface (sqm)",
+            "Garden surface": "Garden surface (sqm)",
+        }
+    )
+
+     #Column final Reordering
+
+    new_col_order = [
+        "Locality",
+        "province",
+        "region",
+        "Postal code",
+        "Type of property",
+        "Subtype",
+        "Price (euro)",
+        "Construction year",
+        "New Construction boolean",
+        "Building condition boolean",
+        "Building condition",
+        "Energy class boolean",
+        "Energy class",
+        "Heating type",
+        "Double glazing boolean",
+        "Double glazing",
+        "Elevator boolean",
+        "Elevator",
+        "Accessible for disabled people boolean",
+        "Accessible for disabled people",
+        "Living surface (sqm)",
+        "Furnished boolean",
+        "Furnished",
+        "Nb of Bedrooms",
+        "Bathrooms total nb boolean",
+        "Bathrooms total nb",
+        "Bathrooms",
+        "Shower rooms",
+        "Kitchen equipped boolean",
+        "Kitchen type",
+        "Open fire",
+        "Number of frontages",
+        "Swimming pool boolean",
+        "Swimming pool",
+        "Plot surface (sqm)",
+        "Terrace boolean",
+        "Terrace surface (sqm)",
+        "Garden boolean",
+        "Garden surface (sqm)",
+        "Parking boolean",
+        "Parking tot nb",
+        "Covered parking spaces",
+        "Outdoor parking spaces",
+        "Flood safe boolean",
+        "Flood zone type",
+        "Tenement building boolean",
+        "Tenement building",
+        "URL",
+        "Property ID",
+    ]
+    df = df[new_col_order]
+
+    df = df.round(0)
+
+    # Drop outliers
+
+    Q75 = df['Price (euro)'].quantile(0.75)
+    Q25 = df['Price (euro)'].quantile(0.25)
+    iqr = Q75- Q25
+    upper = Q75 + (1.5 * iqr)
+    lower = Q25 - (1.5 * iqr)
+
+    df = df[(df['Price (euro)'] > lower) & (df['Price (euro)'] < upper)]
+
+    Q75 = df['Plot surface (sqm)'].quantile(0.75)
+    Q25 = df['Plot surface (sqm)'].quantile(0.25)
+    iqr = Q75- Q25
+    upper = Q75 + (1.5 * iqr)
+    lower = Q25 - (1.5 * iqr)
+
+    df = df[(df['Plot surface (sqm)'] > lower) & (df['Plot surface (sqm)'] < upper)]
+    df['Locality'] = df['Locality'].str.capitalize()
+    df['Price (sqm)'] = df['Price (euro)'] / df['Living surface (sqm)']
+    return df
@@ -0,0 +1,58 @@
+"""
+Reference BeautifulSoup implementation of the search-page link extraction, as
+Immoweb_Scraper.extract_immoweb_urls was written before scraper.links. Only
+used to check that the single-pass extractor finds the same URLs and to
+measure the speedup.
+"""
+from bs4 import BeautifulSoup
+
+from scraper.urls import unique_urls
+
+
+def legacy_extract_links(url_content):
+    lst = []
+    soup = BeautifulSoup(url_content, "lxml")
+    
+    # Try multiple selectors to find property links
+    selectors = [
+        ("a", {"class": "card__title-link"}),
+        ("a", {"class": "card-title-link"}),
+        ("a", {"class": "search-result__title-link"}),
+        ("a", {"class": "property-link"}),
+        ("a", {"class": lambda x: x and "card" in x.lower() and "link" in x.lower()}),
+    ]
+    
+    # First, try finding links by href pattern (most reliable method)
+    for tag in soup.find_all("a", href=True):
+        href = tag.get("href", "")
+        if not href:
+            continue
+            
+        # Normalize href
+        if href.startswith("/"):
+            href = f"https://www.immoweb.be{href}"
+        elif not href.startswith("http"):
+            continue
+            
+        # Check if it's a property URL
+        if ("www.immoweb.be" in href or "immoweb.be" in href) and \
+           ("/property/" in href or "/en/classified/" in href or "/fr/classified/" in href or "/nl/classified/" in href) and \
+           "new-real-estate-project" not in href:
+            lst.append(href)
+    
+    # Try the specific class selectors
+    for tag_name, attrs in selectors:
+        try:
+            for tag in soup.find_all(tag_name, attrs=attrs):
+                immoweb_url = tag.get("href")
+                if immoweb_url:
+                    if immoweb_url.startswith("/"):
+                        immoweb_url = f"https://www.immoweb.be{immoweb_url}"
+                    if ("www.immoweb.be" in immoweb_url or "immoweb.be" in immoweb_url) and \
+                       "new-real-estate-project" not in immoweb_url:
+                        lst.append(immoweb_url)
+        except Exception as e:
+            # Skip if selector fails
+            continue
+
+    return unique_urls(lst)
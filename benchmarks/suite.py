@@ -0,0 +1,290 @@
+"""
+Offline benchmark suite of every pipeline stage.
+
+Each stage of the scraper runs on synthetic data, without touching the
+network: link extraction from search pages, detail-page parsing,
+record collection (add_record), Raw_DataFrame, Clean_DataFrame and the CSV writers. For
+every stage and size the suite reports the wall-clock time, the throughput
+and the peak memory allocated by Python (tracemalloc, measured in a second
+run so that tracing does not slow the timed one).
+
+Results are written to JSON. Passing a previous result file as --baseline
+compares the stages one by one and exits with status 1 when one got slower
+than the tolerance allows, to catch regressions between versions.
+
+Usage: python -m benchmarks.suite [--rows 1000 10000 100000 1000000] [--output results.json]
+                                  [--baseline previous.json] [--tolerance 0.25]
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic import classified_pages, raw_csv, raw_records, search_pages
+from scraper.listings import search_listings
+from scraper.parser import parse_classified
+from scraper.scraper import Immoweb_Scraper
+
+
+def measure(setup, stage, memory=True):
+    """
+    Time one stage, then measure its peak memory.
+
+    Args:
+    - setup (callable): Builds the input of the stage, not timed.
+    - stage (callable): Stage to benchmark, called with the result of setup.
+    - memory (bool): Also run the stage under tracemalloc.
+
+    Returns:
+    - tuple: (seconds, peak memory in bytes or None)
+    """
+    state = setup()
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stage(state)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        state = setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                stage(state)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+
+def _scraper():
+    return Immoweb_Scraper(1, connect=False)
+
+
+def page_stages(search_count, classified_count):
+    """
+    Stages working on HTML pages.
+
+    Args:
+    - search_count (int): Number of synthetic search pages.
+    - classified_count (int): Number of synthetic classified pages.
+
+    Returns:
+    - list: (stage name, size, unit, setup, stage) tuples.
+    """
+    searches = search_pages(search_count)
+    classifieds = classified_pages(classified_count)
+
+    def extract_links(state):
+        scraper = state
+        for url, content in searches:
+            scraper.extract_immoweb_urls(url, content)
+
+    def listings(state):
+        for content, urls in state:
+            search_listings(content, urls)
+
+    def listings_setup():
+        scraper = _scraper()
+        return [(content, scraper.extract_immoweb_urls(url, content)) for url, content in searches]
+
+    def process_url(state):
+        scraper = state
+        for url, content in classifieds:
+            scraper.process_url(url, BeautifulSoup(content, "lxml"))
+
+    def parse(state):
+        scraper = state
+        for url, content in classifieds:
+            parse_classified(url, content, scraper.element_list)
+
+    return [
+        ("extract_immoweb_urls", search_count, "pages", _scraper, extract_links),
+        ("search_listings", search_count, "pages", listings_setup, listings),
+        ("process_url", classified_count, "pages", _scraper, process_url),
+        ("parse_classified", classified_count, "pages", _scraper, parse),
+    ]
+
+
+def row_stages(rows, directory):
+    """
+    Stages working on the dataset, run in a directory holding data/raw_data and data/clean_data.
+
+    Args:
+    - rows (int): Number of scraped records.
+    - directory (str): Working directory of the stages.
+
+    Returns:
+    - list: (stage name, size, unit, setup, stage) tuples.
+    """
+    records = raw_records(rows)
+    raw_path = os.path.join(directory, "data", "raw_data", "data_set_RAW.csv")
+    # Clean dataset written by the to_csv_clean stage
+    raw_csv(raw_path, rows)
+    clean = _scraper()
+    with contextlib.redirect_stdout(io.StringIO()):
+        clean.Clean_DataFrame()
+
+    def with_records():
+        scraper = _scraper()
+        for record in records:
+            scraper.add_record(record)
+        return scraper
+
+    def with_raw_frame():
+        scraper = with_records()
+        scraper.Raw_DataFrame()
+        return scraper
+
+    def add_records(scraper):
+        for record in records:
+            scraper.add_record(record)
+
+    def with_raw_csv():
+        raw_csv(raw_path, rows)
+        return _scraper()
+
+    def with_clean_frame():
+        scraper = _scraper()
+        scraper.data_set_df = clean.data_set_df.copy()
+        return scraper
+
+    return [
+        ("add_record", rows, "rows", _scraper, add_records),
+        ("Raw_DataFrame", rows, "rows", with_records, lambda scraper: scraper.Raw_DataFrame()),
+        ("to_csv_raw", rows, "rows", with_raw_frame, lambda scraper: scraper.to_csv_raw()),
+        ("Clean_DataFrame", rows, "rows", with_raw_csv, lambda scraper: scraper.Clean_DataFrame()),
+        ("to_csv_clean", len(clean.data_set_df), "rows", with_clean_frame, lambda scraper: scraper.to_csv_clean()),
+    ]
+
+
+def run(rows_list, search_count, classified_count, memory=True):
+    """
+    Run the whole suite.
+
+    Args:
+    - rows_list (list): Dataset sizes of the row stages.
+    - search_count (int): Number of synthetic search pages.
+    - classified_count (int): Number of synthetic classified pages.
+    - memory (bool): Measure the peak memory of every stage.
+
+    Returns:
+    - list: One result dict per stage and size.
+    """
+    results = []
+
+    def record(name, size, unit, setup, stage):
+        seconds, peak = measure(setup, stage, memory)
+        result = {
+            "stage": name,
+            "size": size,
+            "unit": unit,
+            "seconds": seconds,
+            "throughput": size / seconds if seconds > 0 else None,
+            "peak_memory_bytes": peak,
+        }
+        results.append(result)
+        print(f"{name:<22} {size:>9} {unit:<5} {seconds:>9.3f}s {result['throughput'] or 0:>12.1f} {unit}/s"
+              + (f" {peak / 2**20:>10.1f} MiB" if peak is not None else ""))
+
+    for stage in page_stages(search_count, classified_count):
+        record(*stage)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "data", "raw_data"))
+        os.makedirs(os.path.join(directory, "data", "clean_data"))
+        # The scraper reads and writes its CSVs relative to the working directory
+        os.chdir(directory)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                for rows in rows_list:
+                    for stage in row_stages(rows, directory):
+                        record(*stage)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a previous run.
+
+    Args:
+    - results (list): Results of this run.
+    - baseline (list): Results of the previous run.
+    - tolerance (float): Accepted slowdown, 0.25 meaning 25% slower.
+
+    Returns:
+    - list: (stage, size, ratio) of the stages slower than the tolerance allows.
+    """
+    previous = {(result["stage"], result["size"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["stage"], result["size"]))
+        if before is None or not before["seconds"]:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append((result["stage"], result["size"], ratio))
+            flag = "  REGRESSION"
+        print(f"{result['stage']:<22} {result['size']:>9} {ratio:>6.2f}x the baseline time{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the scraper offline.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Dataset sizes of the row stages (e.g. 1000 10000 100000 1000000)")
+    parser.add_argument("--search-pages", type=int, default=100, help="Number of synthetic search pages")
+    parser.add_argument("--classified-pages", type=int, default=300, help="Number of synthetic classified pages")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of every stage")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file receiving the results")
+    parser.add_argument("--label", default=None, help="Name of this run in the JSON file, e.g. a version")
+    parser.add_argument("--baseline", default=None, help="Previous JSON result file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Accepted slowdown against the baseline")
+    args = parser.parse_args()
+
+    print(f"{'stage':<22} {'size':>9} {'unit':<5} {'time':>10} {'throughput':>19}"
+          + ("" if args.no_memory else f" {'peak memory':>14}"))
+    results = run(args.rows, args.search_pages, args.classified_pages, memory=not args.no_memory)
+
+    report = {
+        "label": args.label,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
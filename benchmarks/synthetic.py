@@ -0,0 +1,319 @@
+"""
+Synthetic Immoweb-like pages for offline benchmarks.
+"""
+from html import escape
+import json
+import random
+
+from scraper.parser import ELEMENT_LIST
+
+
+SUBTYPES = ["house", "apartment", "villa", "loft", "penthouse", "duplex", "ground-floor", "flat-studio", "mansion"]
+LOCALITIES = [("bruxelles", 1000), ("wavre", 1300), ("leuven", 3000), ("antwerpen", 2000), ("hasselt", 3500),
+              ("liege", 4000), ("namur", 5000), ("charleroi", 6000), ("mons", 7000), ("arlon", 6700),
+              ("brugge", 8000), ("gent", 9000)]
+TABLE_VALUES = {
+    "Construction year": lambda rng: str(rng.randint(1900, 2024)),
+    "Bedrooms": lambda rng: str(rng.randint(1, 6)),
+    "Living area": lambda rng: f"{rng.randint(40, 400)} <span class=\"abbreviation\"><span aria-hidden=\"true\"> m² </span><span class=\"sr-only\"> square meters </span></span>",
+    "Kitchen type": lambda rng: rng.choice(["Installed", "Hyper equipped", "Semi equipped", "Not installed", "USA installed"]),
+    "Furnished": lambda rng: rng.choice(["Yes", "No"]),
+    "Terrace surface": lambda rng: f"{rng.randint(5, 60)} <span class=\"abbreviation\">m²</span>",
+    "Surface of the plot": lambda rng: f"{rng.randint(100, 3000)} <span class=\"abbreviation\">m²</span>",
+    "Garden surface": lambda rng: f"{rng.randint(20, 2000)} <span class=\"abbreviation\">m²</span>",
+    "Number of frontages": lambda rng: str(rng.randint(1, 4)),
+    "Swimming pool": lambda rng: rng.choice(["Yes", "No"]),
+    "Building condition": lambda rng: rng.choice(["As new", "Good", "Just renovated", "To renovate", "To be done up"]),
+    "Energy class": lambda rng: rng.choice(["A++", "A+", "A", "B", "C", "D", "E", "F", "Not specified"]),
+    "Tenement building": lambda rng: rng.choice(["Yes", "No"]),
+    "Flood zone type": lambda rng: rng.choice(["Non flood zone", "Possible flood zone", "Recognized flood zone"]),
+    "Double glazing": lambda rng: rng.choice(["Yes", "No"]),
+    "Heating type": lambda rng: rng.choice(["Gas", "Fuel oil", "Electric", "Pellet"]),
+    "Bathrooms": lambda rng: str(rng.randint(1, 3)),
+    "Elevator": lambda rng: rng.choice(["Yes", "No"]),
+    "Accessible for disabled people": lambda rng: rng.choice(["Yes", "No"]),
+    "Outdoor parking spaces": lambda rng: str(rng.randint(0, 3)),
+    "Covered parking spaces": lambda rng: str(rng.randint(0, 3)),
+    "Shower rooms": lambda rng: str(rng.randint(0, 2)),
+}
+EXTRA_HEADERS = ["Street frontage width", "Cadastral income", "Available as of", "CO₂ emission", "Website"]
+
+
+def classified_url(rng, property_id=None, language="en"):
+    """
+    Build a random classified URL.
+
+    Args:
+    - rng (random.Random): Random generator.
+    - property_id (int): Property ID, random if None.
+    - language (str): Language segment of the URL.
+
+    Returns:
+    - str: Classified URL.
+    """
+    locality, postal_code = rng.choice(LOCALITIES)
+    property_id = property_id if property_id is not None else rng.randint(10_000_000, 11_999_999)
+    return f"https://www.immoweb.be/{language}/classified/{rng.choice(SUBTYPES)}/for-sale/{locality}/{postal_code + rng.randint(0, 99)}/{property_id}"
+
+
+def classified_page(rng, with_payload=False):
+    """
+    Build the HTML of a classified page.
+
+    Args:
+    - rng (random.Random): Random generator.
+    - with_payload (bool): Embed a window.classified JSON payload.
+
+    Returns:
+    - bytes: HTML of the page.
+    """
+    price = rng.randint(80, 1500) * 1000
+    paragraphs = [rng.choice(["Beautiful house close to the centre.", "Open fire in the living room.",
+                              "Quiet street with garden.", "Cheminée et feu ouvert.", "Renovated in 2019."])
+                  for _ in range(rng.randint(1, 6))]
+    headers = rng.sample(ELEMENT_LIST, rng.randint(8, len(ELEMENT_LIST))) + rng.sample(EXTRA_HEADERS, 3)
+    rng.shuffle(headers)
+    tables = []
+    for start in range(0, len(headers), 6):
+        rows = []
+        for header in headers[start:start + 6]:
+            value = TABLE_VALUES[header](rng) if header in TABLE_VALUES else "Lorem ipsum"
+            rows.append(
+                "<tr class=\"classified-table__row\">\n"
+                f"  <th class=\"classified-table__header\" scope=\"row\">\n    {header}\n  </th>\n"
+                f"  <td class=\"classified-table__data\">\n    {value}\n  </td>\n"
+                "</tr>"
+            )
+        tables.append("<table class=\"classified-table\"><tbody>" + "\n".join(rows) + "</tbody></table>")
+    payload = ""
+    if with_payload:
+        payload = "<script type=\"text/javascript\">window.classified = " + json.dumps({
+            "id": rng.randint(10_000_000, 11_999_999),
+            "price": {"mainValue": price},
+            "property": {"bedroomCount": rng.randint(1, 6), "bathroomCount": rng.randint(1, 3),
+                         "netHabitableSurface": rng.randint(40, 400),
+                         "building": {"constructionYear": rng.randint(1900, 2024), "facadeCount": rng.randint(1, 4)}},
+        }) + ";\n</script>"
+    navigation = "".join(f"<li><a href=\"/en/search/house/for-sale?page={i}\">Page {i}</a></li>" for i in range(40))
+    html = (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Immoweb</title>"
+        f"{payload}</head><body><header><nav><ul>{navigation}</ul></nav></header><main>"
+        f"<p class=\"classified__price\"><span class=\"sr-only\">€{price:,}</span></p>"
+        f"<p class=\"classified__price\">€{price:,} <span>{price} €</span></p>"
+        "<div id=\"classified-description-content-text\">"
+        + "".join(f"<p>{p}</p>" for p in paragraphs)
+        + "</div>"
+        + "".join(tables)
+        + "</main><footer>" + "<p>Footer text</p>" * 20 + "</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def classified_pages(count, seed=0, with_payload=False):
+    """
+    Build (url, html) pairs of classified pages.
+
+    Args:
+    - count (int): Number of pages.
+    - seed (int): Seed of the random generator.
+    - with_payload (bool): Embed a window.classified JSON payload.
+
+    Returns:
+    - list: (url, bytes) tuples.
+    """
+    rng = random.Random(seed)
+    return [(classified_url(rng, 10_000_000 + i), classified_page(rng, with_payload)) for i in range(count)]
+
+
+def search_page(rng, results=30):
+    """
+    Build the HTML of a search result page.
+
+    Each result card links to its classified twice (title and picture), next
+    to navigation links, new real estate projects and relative links, as on
+    the real search pages. The results are also embedded as JSON in the
+    :results attribute of an <iw-search> element, some without living area.
+
+    Args:
+    - rng (random.Random): Random generator.
+    - results (int): Number of result cards.
+
+    Returns:
+    - bytes: HTML of the page.
+    """
+    cards = []
+    payload = []
+    for _ in range(results):
+        url = classified_url(rng, language=rng.choice(["en", "en", "fr", "nl"]))
+        href = url[len("https://www.immoweb.be"):] if rng.random() < 0.2 else url
+        link_class = rng.choice(["card__title-link", "card__title-link", "card-title-link", "card--result__link"])
+        result_property = {"bedroomCount": rng.randint(1, 6), "location": {"postalCode": url.split("/")[-2]}}
+        if rng.random() < 0.9:
+            result_property["netHabitableSurface"] = rng.randint(40, 400)
+        if rng.random() < 0.5:
+            result_property["landSurface"] = rng.randint(100, 3000)
+        payload.append({"id": int(url.split("/")[-1]), "price": {"mainValue": rng.randint(80, 1500) * 1000},
+                        "property": result_property})
+        cards.append(
+            "<li class=\"search-results__item\"><article class=\"card card--result\">"
+            f"<a class=\"card__media-link\" href=\"{href}\"><img src=\"/img/{rng.randint(1, 10**6)}.jpg\"></a>"
+            f"<h2 class=\"card__title\"><a class=\"{link_class}\" href=\"{href}\">House for sale</a></h2>"
+            f"<p class=\"card__price\">€{rng.randint(80, 1500) * 1000:,}</p>"
+            "</article></li>"
+        )
+    for _ in range(rng.randint(0, 3)):
+        cards.insert(rng.randint(0, len(cards)), (
+            "<li class=\"search-results__item\"><article class=\"card card--result\">"
+            "<a class=\"card__title-link\" href=\"https://www.immoweb.be/en/classified/new-real-estate-project-houses/"
+            f"for-sale/gent/9000/{rng.randint(10_000_000, 11_999_999)}\">New project</a></article></li>"
+        ))
+    navigation = "".join(f"<li><a href=\"/en/search/house/for-sale?page={i}\">Page {i}</a></li>" for i in range(1, 40))
+    html = (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Immoweb search</title></head>"
+        f"<body><header><nav><ul>{navigation}</ul></nav></header><main>"
+        f"<iw-search :results=\"{escape(json.dumps(payload))}\"></iw-search><ul class=\"search-results\">"
+        + "".join(cards)
+        + "</ul></main><footer><a href=\"https://www.immoweb.be/en/about\">About</a>"
+        + "<a href=\"mailto:info@immoweb.be\">Contact</a></footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def search_pages(count, seed=0, results=30):
+    """
+    Build (url, html) pairs of search result pages.
+
+    Args:
+    - count (int): Number of pages.
+    - seed (int): Seed of the random generator.
+    - results (int): Number of result cards per page.
+
+    Returns:
+    - list: (url, bytes) tuples.
+    """
+    rng = random.Random(seed)
+    return [
+        (f"https://www.immoweb.be/en/search/house-and-apartment/for-sale?countries=BE&page={i}&orderBy=relevance",
+         search_page(rng, results))
+        for i in range(1, count + 1)
+    ]
+
+
+RAW_CHOICES = {
+    "Kitchen type": ["Installed", "Hyperequipped", "Semiequipped", "Notinstalled", "USAinstalled", "USAhyperequipped", "USAuninstalled"],
+    "Furnished": ["Yes", "No"],
+    "Swimming pool": ["Yes", "No"],
+    "Building condition": ["Asnew", "Good", "Justrenovated", "Torenovate", "Tobedoneup", "Torestore"],
+    "Energy class": ["A++", "A+", "A", "B", "C", "D", "E", "F", "G", "Notspecified"],
+    "Tenement building": ["Yes", "No"],
+    "Flood zone type": ["Nonfloodzone", "Possiblefloodzone", "Recognizedfloodzone", "Circumscribedzone"],
+    "Double glazing": ["Yes", "No"],
+    "Heating type": ["Gas", "Fueloil", "Electric", "Pellet", "Wood"],
+    "Elevator": ["Yes", "No"],
+    "Accessible for disabled people": ["Yes", "No"],
+}
+RAW_RANGES = {
+    "Construction year": (1850, 2026),
+    "Bedrooms": (0, 8),
+    "Living area": (20, 600),
+    "Terrace surface": (1, 80),
+    "Surface of the plot": (0, 5000),
+    "Garden surface": (1, 3000),
+    "Number of frontages": (1, 5),
+    "Bathrooms": (0, 4),
+    "Outdoor parking spaces": (0, 5),
+    "Covered parking spaces": (0, 4),
+    "Shower rooms": (0, 3),
+}
+LOCALITY_NAMES = ["bruxelles", "li%C3%A8ge", "wavre", "leuven", "antwerpen", "hasselt", "namur", "charleroi",
+                  "mons", "arlon", "brugge", "gent", "ath%20(ath)", "m%C3%A9lin", "sint-niklaas"]
+
+
+def raw_dataframe(rows, seed=0, missing=0.3):
+    """
+    Build a raw dataset shaped like data_set_RAW.csv.
+
+    Values use the same spellings as the scraped tables (e.g. "Hyperequipped"),
+    optional fields are missing with the given probability, a few Property IDs
+    are duplicated and a few rows miss their postal code.
+
+    Args:
+    - rows (int): Number of rows.
+    - seed (int): Seed of the random generator.
+    - missing (float): Probability of an optional field being empty.
+
+    Returns:
+    - pd.DataFrame: Raw dataset with the columns of Immoweb_Scraper.raw_columns.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    property_id = 10_000_000 + rng.integers(0, int(rows * 1.05) + 1, rows)
+    locality = rng.choice(LOCALITY_NAMES, rows)
+    postal_code = rng.integers(1000, 10000, rows).astype(float)
+    postal_code[rng.random(rows) < 0.01] = np.nan
+    subtype = rng.choice(SUBTYPES + ["kot", "triplex", "service-flat", "farmhouse"], rows)
+    data = {
+        "url": [f"https://www.immoweb.be/en/classified/{s}/for-sale/{l}/{p}/{i}"
+                for s, l, p, i in zip(subtype, locality, np.nan_to_num(postal_code).astype(int), property_id)],
+        "Property ID": property_id,
+        "Locality name": locality,
+        "Postal code": postal_code,
+        "Subtype of property": subtype,
+        "Open Fire": rng.integers(0, 2, rows),
+        "Price": np.where(rng.random(rows) < 0.05, 0, rng.integers(50, 2000, rows) * 1000),
+    }
+    for column in ELEMENT_LIST:
+        if column in RAW_CHOICES:
+            values = rng.choice(RAW_CHOICES[column], rows).astype(object)
+        else:
+            low, high = RAW_RANGES[column]
+            values = rng.integers(low, high, rows).astype(float)
+        values[rng.random(rows) < missing] = np.nan
+        data[column] = values
+    return pd.DataFrame(data)
+
+
+def raw_csv(path, rows, seed=0):
+    """
+    Write a raw dataset to CSV and read it back, as Clean_DataFrame sees it.
+
+    Args:
+    - path (str): CSV file to write.
+    - rows (int): Number of rows.
+    - seed (int): Seed of the random generator.
+
+    Returns:
+    - pd.DataFrame: Dataset read back from the CSV.
+    """
+    import pandas as pd
+
+    raw_dataframe(rows, seed).to_csv(path, index=False)
+    return pd.read_csv(path, delimiter=',')
+
+
+def raw_records(rows, seed=0):
+    """
+    Build scraped records, as the parser returns them before they go into Immoweb_Scraper.data_set.
+
+    Table values are strings and missing table rows are absent keys.
+
+    Args:
+    - rows (int): Number of records.
+    - seed (int): Seed of the random generator.
+
+    Returns:
+    - list: Records of raw_dataframe(rows, seed).
+    """
+    records = []
+    for row in raw_dataframe(rows, seed).to_dict("records"):
+        record = {}
+        for key, value in row.items():
+            if isinstance(value, float):
+                if value != value:
+                    continue
+                value = int(value)
+            record[key] = value if key in ("Open Fire", "Price") else str(value)
+        records.append(record)
+    return records
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "last_modified", "fresh"])
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache for Immoweb responses.
+
+    Bodies are stored zlib-compressed under their SHA-256 digest, so identical
+    pages are kept once. An SQLite index maps each URL to its body and
+    validators (ETag / Last-Modified). Entries are fresh for a TTL that
+    depends on the URL class, stale entries are revalidated with a
+    conditional request, and the least recently used entries are evicted
+    once the bodies exceed max_bytes.
+    """
+
+    DEFAULT_TTLS = {
+        "search": 60 * 60,
+        "classified": 7 * 24 * 60 * 60,
+        "other": 24 * 60 * 60,
+    }
+
+    def __init__(self, directory="data/cache", max_bytes=512 * 1024 * 1024, ttls=None) -> None:
+        """
+        Initialize the ResponseCache object.
+
+        Args:
+        - directory (str): Directory holding the index and the compressed bodies.
+        - max_bytes (int): Maximum size of the compressed bodies on disk.
+        - ttls (dict): Seconds an entry stays fresh, per URL class ("search", "classified", "other").
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        # The worker processes of a distributed crawl share the cache, see scraper.worker
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), timeout=60, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+            CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def url_class(url):
+        """
+        Classify a URL to pick its TTL.
+
+        Args:
+        - url (str): Requested URL.
+
+        Returns:
+        - str: "search", "classified" or "other".
+        """
+        if "/search/" in url:
+            return "search"
+        if "/classified/" in url or "/property/" in url:
+            return "classified"
+        return "other"
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".zlib")
+
+    def lookup(self, url):
+        """
+        Look up a URL in the cache.
+
+        Args:
+        - url (str): Requested URL.
+
+        Returns:
+        - CacheEntry: Cached body and validators, or None if the URL is not cached.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, etag, last_modified, fetched_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, etag, last_modified, fetched_at = row
+            try:
+                with open(self._object_path(digest), "rb") as f:
+                    body = zlib.decompress(f.read())
+            except (OSError, zlib.error):
+                # Body lost or corrupted: forget the entry and fetch again
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._db.commit()
+                return None
+            now = time.time()
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+            self._db.commit()
+        fresh = now - fetched_at < self.ttls[self.url_class(url)]
+        return CacheEntry(body, etag, last_modified, fresh)
+
+    @staticmethod
+    def conditional_headers(entry):
+        """
+        Build the headers revalidating a stale entry.
+
+        Args:
+        - entry (CacheEntry): Entry returned by lookup, or None.
+
+        Returns:
+        - dict: If-None-Match / If-Modified-Since headers.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url, body, headers):
+        """
+        Store a freshly downloaded body.
+
+        Args:
+        - url (str): Requested URL.
+        - body (bytes): Response body.
+        - headers (Mapping): Response headers.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        now = time.time()
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone() is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                data = zlib.compress(body, 6)
+                # Another process may be storing the same body at the same time
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._db.execute("INSERT OR IGNORE INTO objects (digest, size) VALUES (?, ?)", (digest, len(data)))
+            previous = self._db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (url, digest, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, headers.get("ETag"), headers.get("Last-Modified"), now, now),
+            )
+            if previous is not None and previous[0] != digest:
+                self._drop_unreferenced(previous[0])
+            self._evict()
+            self._db.commit()
+
+    def revalidated(self, url, headers):
+        """
+        Mark a cached entry as fresh again after a 304 Not Modified.
+
+        Args:
+        - url (str): Requested URL.
+        - headers (Mapping): Headers of the 304 response.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, headers.get("ETag"), headers.get("Last-Modified"), url),
+            )
+            self._db.commit()
+
+    def size(self):
+        """
+        Returns:
+        - int: Size in bytes of the compressed bodies on disk.
+        """
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _drop_unreferenced(self, digest):
+        if self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._db.execute(
+                "SELECT url, digest FROM entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            for url, digest in oldest:
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._drop_unreferenced(digest)
+                total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+                if total <= self.max_bytes:
+                    break
@@ -0,0 +1,560 @@
+"""
+Vectorized cleaning of the raw Immoweb dataset.
+
+clean_dataframe() produces exactly the same DataFrame as the original
+row-wise Clean_DataFrame: every derived column is computed with whole-column
+operations and lookup tables, and keeps the dtype that Series.apply used to
+infer (int64 without missing values, float64 with some, object when all
+values are missing).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from scraper.constants import APARTMENT_SUBTYPES
+
+
+LOCALITY_PATTERNS = [re.escape('?'), '%C3%8B','%28','%29', '%27','%20', '%C3%A8', '%C3%8A', '%C3%AA', '%C3%88', '%C3%89', '%C3%A9', '%C3%A0', '%C3%A2', '%C3%82', '%C3%80','%C3%BB']
+LOCALITY_REPLACEMENTS = [' ', 'e','','',' ', ' ', 'e', 'e','e', 'e','e', 'e', 'a', 'a', 'a','a', 'u', ]
+
+NUMERIC_COLUMNS = [
+    "Property ID",
+    "Postal code",
+    "Open Fire",
+    "Price",
+    "Construction year",
+    "Number of frontages",
+    "Covered parking spaces",
+    "Outdoor parking spaces",
+    "Living area",
+    "Bedrooms",
+    "Bathrooms",
+    "Surface of the plot",
+    "Garden surface",
+    "Terrace surface",
+    "Shower rooms",
+]
+
+PROVINCE_RANGES = [
+    ((1000, 1300), 'Brussels Hoofdstedelijk Gewest'),
+    ((1300, 1500), 'Waals-Brabant'),
+    ((1500, 1990), 'Vlaams-Brabant'),
+    ((3000, 3500), 'Vlaams-Brabant'),
+    ((2000, 3000), 'Antwerpen'),
+    ((3500, 4000), 'Limburg'),
+    ((4000, 5000), 'Luik'),
+    ((5000, 6000), 'Namen'),
+    ((6000, 6600), 'Henegouwen'),
+    ((7000, 8000), 'Henegouwen'),
+    ((6600, 7000), 'Luxemburg'),
+    ((8000, 9000), 'West-Vlaanderen'),
+    ((9000, 10000), 'Oost-Vlaanderen'),
+]
+
+REPLACE_BUILDING_CONDITION = {
+    "Asnew": "As new",
+    "Justrenovated": "Just renovated",
+    "Tobedoneup": "To be done",
+    "Torenovate": "To renovate",
+    "Torestore" : "To restore"
+}
+REPLACE_KITCHEN_TYPE = {
+    "Hyperequipped": "Hyper equipped",
+    "Semiequipped": "Semi equipped",
+    "USAhyperequipped": "USA hyper equipped",
+    "Notinstalled": "Not installed",
+    "USAinstalled": "USA installed",
+    "USAsemiequipped": "USA semi-equipped",
+    "USAuninstalled" : "USA uninstalled"
+}
+REPLACE_HEATING_TYPE = {"Fueloil": "Fuel oil"}
+REPLACE_FLOOD_ZONE_TYPE = {
+    "Nonfloodzone": "Non flood zone",
+    "Circumscribedzone": "Circumscribed zone",
+    "Possiblecircumscribedwatersidezone": "Possible circumscribed waterside zone",
+    "Possiblefloodzone": "Possible flood zone",
+    "Recognizedfloodzone": "Recognized flood zone",
+    "Propertypartiallyorcompletelylocatedinacircumscribedandrecognizedfloodzone": "Property partially or completely located in a circumscribed and recognized flood zone",
+    "Propertypartiallyorcompletelylocatedinacircumscribedfloodzone" : "Property partially or completely located in a circumscribed flood zone",
+    "Propertypartiallyorcompletelylocatedinapossiblefloodzoneandlocatedinacircumscribedwatersidezone" : "Property partially or completely located in a possible flood zone and located in a circumscribed waterside zone",
+}
+REPLACE_ENERGY_CLASS = {"Notspecified": "Not specified"}
+
+RENAMED_COLUMNS = {
+    "url": "URL",
+    "Price": "Price (euro)",
+    "Surface of the plot": "Plot surface (sqm)",
+    "Open Fire": "Open fire",
+    "Locality name": "Locality",
+    "Subtype of property": "Subtype",
+    "Living area": "Living surface (sqm)",
+    "Bedrooms": "Nb of Bedrooms",
+    "Terrace surface": "Terrace surface (sqm)",
+    "Garden surface": "Garden surface (sqm)",
+}
+
+CLEAN_COLUMNS = [
+    "Locality",
+    "province",
+    "region",
+    "Postal code",
+    "Type of property",
+    "Subtype",
+    "Price (euro)",
+    "Construction year",
+    "New Construction boolean",
+    "Building condition boolean",
+    "Building condition",
+    "Energy class boolean",
+    "Energy class",
+    "Heating type",
+    "Double glazing boolean",
+    "Double glazing",
+    "Elevator boolean",
+    "Elevator",
+    "Accessible for disabled people boolean",
+    "Accessible for disabled people",
+    "Living surface (sqm)",
+    "Furnished boolean",
+    "Furnished",
+    "Nb of Bedrooms",
+    "Bathrooms total nb boolean",
+    "Bathrooms total nb",
+    "Bathrooms",
+    "Shower rooms",
+    "Kitchen equipped boolean",
+    "Kitchen type",
+    "Open fire",
+    "Number of frontages",
+    "Swimming pool boolean",
+    "Swimming pool",
+    "Plot surface (sqm)",
+    "Terrace boolean",
+    "Terrace surface (sqm)",
+    "Garden boolean",
+    "Garden surface (sqm)",
+    "Parking boolean",
+    "Parking tot nb",
+    "Covered parking spaces",
+    "Outdoor parking spaces",
+    "Flood safe boolean",
+    "Flood zone type",
+    "Tenement building boolean",
+    "Tenement building",
+    "URL",
+    "Property ID",
+]
+
+OUTLIER_COLUMNS = ['Price (euro)', 'Plot surface (sqm)']
+
+
+def _lookup_table(ranges, default):
+    table = np.full(10000, default, dtype=object)
+    # Earlier ranges win, as in the original loop over the ranges
+    for (start, stop), value in reversed(ranges):
+        table[start:stop] = value
+    return table
+
+
+PROVINCE_BY_POSTAL_CODE = _lookup_table(PROVINCE_RANGES, None)
+REGION_BY_POSTAL_CODE = _lookup_table(
+    [((1300, 1500), 'Wallonia'), ((4000, 7000), 'Wallonia'), ((1000, 1300), 'Brussels')], 'Flanders'
+)
+
+
+def _flags(source, condition, missing=None):
+    """
+    Vectorized equivalent of
+    source.apply(lambda x: None if <missing> else (1 if <condition> else 0)).
+
+    Args:
+    - source (pd.Series): Column the flag is derived from.
+    - condition (array-like): Boolean condition, only read where the value is not missing.
+    - missing (array-like): Boolean mask of the values mapped to None. Defaults to source.isna().
+
+    Returns:
+    - pd.Series: Flags with the dtype Series.apply would have inferred.
+    """
+    if len(source) == 0:
+        return source.copy()
+    missing = source.isna().to_numpy() if missing is None else np.asarray(missing, dtype=bool)
+    values = np.where(np.asarray(condition, dtype=bool), 1, 0)
+    if not missing.any():
+        return pd.Series(values, index=source.index, dtype="int64")
+    if missing.all():
+        return pd.Series([None] * len(source), index=source.index, dtype=object)
+    return pd.Series(np.where(missing, np.nan, values), index=source.index, dtype="float64")
+
+
+def _labels(source, labels, missing=None):
+    """
+    Vectorized equivalent of source.apply(...) returning strings, None for missing values.
+
+    Args:
+    - source (pd.Series): Column the labels are derived from.
+    - labels (np.ndarray): Label of each row.
+    - missing (array-like): Boolean mask of the values mapped to None. Defaults to source.isna().
+
+    Returns:
+    - pd.Series: Object column of labels.
+    """
+    if len(source) == 0:
+        return source.copy()
+    missing = source.isna().to_numpy() if missing is None else np.asarray(missing, dtype=bool)
+    labels = np.array(labels, dtype=object)
+    labels[missing] = None
+    return pd.Series(labels, index=source.index, dtype=object)
+
+
+# Every casing of "yes", i.e. the values for which x.lower() == "yes"
+YES_SPELLINGS = [y + e + s for y in "yY" for e in "eE" for s in "sS"]
+
+
+def _is_yes(source):
+    return source.isin(YES_SPELLINGS).to_numpy()
+
+
+def _postal_code_lookup(postal_codes, table, default):
+    # A postal code only matches a range when it is a whole number, like
+    # `value in range(...)` did for the floats of a column with missing values
+    values = postal_codes.to_numpy(dtype="float64", na_value=np.nan)
+    whole = np.isfinite(values) & (values == np.floor(values)) & (values >= 0) & (values < len(table))
+    labels = np.full(len(values), default, dtype=object)
+    labels[whole] = table[values[whole].astype(np.int64)]
+    return labels
+
+
+def _readable_locality(name):
+    # Same steps as the column-wise str.contains (regex) / str.replace (literal) passes
+    if not isinstance(name, str):
+        return name
+    for pattern, replacement in zip(LOCALITY_PATTERNS, LOCALITY_REPLACEMENTS):
+        if re.search(pattern, name):
+            name = name.replace(pattern, replacement)
+    return name
+
+
+def raw_dtypes(df):
+    """
+    Give an in-memory raw dataset the dtypes pd.read_csv infers for data_set_RAW.csv.
+
+    The scraper keeps every table value as a string, so handing its DataFrame
+    to clean_dataframe() as is would not behave like reading the CSV back
+    (e.g. the postal code filter depends on the column being numeric).
+    Columns whose values all parse as numbers become int64, or float64 when
+    some are missing, empty strings count as missing, other columns stay object.
+
+    Args:
+    - df (pd.DataFrame): Raw dataset built from the scraped records.
+
+    Returns:
+    - pd.DataFrame: New DataFrame with the CSV dtypes.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object:
+            values = values.where(values.notna() & (values != ""), np.nan)
+            try:
+                values = pd.to_numeric(values)
+            except (ValueError, TypeError):
+                pass
+        columns[column] = values
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+
+
+def drop_invalid_rows(df):
+    """
+    Drop duplicated Property IDs and rows with a wrong postal code.
+
+    Args:
+    - df (pd.DataFrame): Raw dataset.
+
+    Returns:
+    - pd.DataFrame: Filtered dataset.
+    """
+    return drop_wrong_postal_codes(drop_duplicate_ids(df))
+
+
+def drop_duplicate_ids(df):
+    """
+    Keep the first row of each Property ID.
+
+    Args:
+    - df (pd.DataFrame): Raw dataset.
+
+    Returns:
+    - pd.DataFrame: Filtered dataset.
+    """
+    #drop duplicate based of property id
+    if 'Property ID' in df.columns:
+        df = df.drop_duplicates(subset=['Property ID'])
+    else:
+        print("Warning: 'Property ID' column not found. Skipping duplicate removal.")
+    return df
+
+
+def drop_wrong_postal_codes(df):
+    """
+    Drop the rows with a wrong postal code and renumber the rows.
+
+    Only depends on each row, so it can run on any subset of the rows.
+
+    Args:
+    - df (pd.DataFrame): Raw dataset.
+
+    Returns:
+    - pd.DataFrame: Filtered dataset.
+    """
+    # suppress wrong postal code
+    if 'Postal code' in df.columns:
+        condition_to_delete = df['Postal code'].astype(str).str.len() < 5
+        df = df[~condition_to_delete]  # Keep rows where postal code length >= 5
+        df = df.reset_index(drop=True)
+    else:
+        print("Warning: 'Postal code' column not found. Skipping postal code filtering.")
+    return df
+
+
+def normalize_columns(df):
+    """
+    Replace the URL-encoded patterns of the locality names and convert the numeric columns.
+
+    Only depends on each row, so it can run on any subset of the rows.
+
+    Args:
+    - df (pd.DataFrame): Dataset returned by drop_invalid_rows.
+
+    Returns:
+    - pd.DataFrame: Dataset with readable localities and numeric columns.
+    """
+    # replacements of ugly pattern
+    if 'Locality name' in df.columns:
+        # Localities repeat a lot: replace the patterns once per distinct name
+        codes, names = pd.factorize(df['Locality name'])
+        readable = np.array([_readable_locality(name) for name in names], dtype=object)
+        changed = np.flatnonzero(readable != np.asarray(names, dtype=object))
+        if len(changed):
+            rows = np.isin(codes, changed)
+            df.loc[rows, 'Locality name'] = readable[codes[rows]]
+    else:
+        print("Warning: 'Locality name' column not found. Skipping pattern replacement.")
+
+    #to convert the Price in a number format
+    df["Price"] = df["Price"].astype(str).str.replace(",", "")
+
+    #to ensure that numeric to be column are containing numeric data
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer', errors='coerce')
+    return df
+
+
+def derive_columns(df):
+    """
+    Create the derived columns, reformat the text columns, rename and reorder.
+
+    Args:
+    - df (pd.DataFrame): Dataset returned by normalize_columns.
+
+    Returns:
+    - pd.DataFrame: Dataset with the columns of data_set_CLEAN, before outlier removal.
+    """
+    #appartment or house classification creation
+    subtype = df["Subtype of property"]
+    df["Type of property"] = _labels(subtype, np.where(subtype.isin(APARTMENT_SUBTYPES).to_numpy(), "Apartment", "House"))
+
+    #New columns creation (arithmetic or spatial aggregation)
+    df["Parking tot nb"] = (df["Covered parking spaces"].fillna(0) + df["Outdoor parking spaces"].fillna(0))
+    df["Bathrooms total nb"] = (df["Bathrooms"].fillna(0) + df["Shower rooms"].fillna(0))
+
+    postal_code = df['Postal code']
+    df['province'] = _labels(postal_code, _postal_code_lookup(postal_code, PROVINCE_BY_POSTAL_CODE, None))
+    df['region'] = _labels(postal_code, _postal_code_lookup(postal_code, REGION_BY_POSTAL_CODE, 'Flanders'))
+
+    #quali>quanti transformatiion : to create boolean output for all columns where it is possibile
+    #through direct converion (yes/no -0/1) or through aggregation
+    construction_year = df["Construction year"]
+    df["New Construction boolean"] = _flags(construction_year, ~(construction_year < 2021).to_numpy())
+
+    df["Tenement building boolean"] = _flags(df["Tenement building"], _is_yes(df["Tenement building"]))
+
+    building_condition = df["Building condition"]
+    df["Building condition boolean"] = _flags(building_condition, building_condition.isin(["Asnew", "Good", "Justrenovated"]))
+
+    flood_zone_type = df["Flood zone type"]
+    df["Flood safe boolean"] = _flags(flood_zone_type, (flood_zone_type == "Nonfloodzone").to_numpy())
+
+    df["Furnished boolean"] = _flags(df["Furnished"], _is_yes(df["Furnished"]))
+
+    kitchen_type = df["Kitchen type"]
+    df["Kitchen equipped boolean"] = _flags(kitchen_type, ~kitchen_type.isin(["Notinstalled", "USAuninstalled"]).to_numpy())
+
+    energy_class = df["Energy class"]
+    df["Energy class boolean"] = _flags(
+        energy_class,
+        energy_class.isin(["A", "A+","A++", "B"]),
+        missing=(energy_class.isna() | (energy_class == 'Notspecified')).to_numpy(),
+    )
+
+    terrace_surface = df["Terrace surface"]
+    df["Terrace boolean"] = _flags(terrace_surface, (terrace_surface > 0).to_numpy(), missing=np.zeros(len(terrace_surface), dtype=bool))
+
+    df["Swimming pool boolean"] = _flags(df["Swimming pool"], _is_yes(df["Swimming pool"]))
+
+    garden_surface = df["Garden surface"]
+    df["Garden boolean"] = _flags(garden_surface, (garden_surface > 0).to_numpy(), missing=np.zeros(len(garden_surface), dtype=bool))
+
+    parking = df["Parking tot nb"]
+    df["Parking boolean"] = _flags(parking, (parking > 0).to_numpy())
+
+    bathrooms = df["Bathrooms total nb"]
+    df["Bathrooms total nb boolean"] = _flags(bathrooms, (bathrooms > 1).to_numpy())
+
+    df["Elevator boolean"] = _flags(df["Elevator"], _is_yes(df["Elevator"]))
+
+    df["Accessible for disabled people boolean"] = _flags(
+        df["Accessible for disabled people"], _is_yes(df["Accessible for disabled people"])
+    )
+
+    df["Double glazing boolean"] = _flags(df["Double glazing"], _is_yes(df["Double glazing"]))
+
+     #text reformating in a more readable way
+    df["Building condition"] = df["Building condition"].replace(REPLACE_BUILDING_CONDITION)
+    df["Kitchen type"] = df["Kitchen type"].replace(REPLACE_KITCHEN_TYPE)
+    df["Heating type"] = df["Heating type"].replace(REPLACE_HEATING_TYPE)
+    df["Flood zone type"] = df["Flood zone type"].replace(REPLACE_FLOOD_ZONE_TYPE)
+    df["Energy class"] = df["Energy class"].replace(REPLACE_ENERGY_CLASS)
+
+    # column renaming for clarity
+    df = df.rename(columns=RENAMED_COLUMNS)
+
+     #Column final Reordering
+    df = df[CLEAN_COLUMNS]
+    return df.round(0)
+
+
+def iqr_bounds(values):
+    """
+    Compute the bounds outside of which a value is an outlier.
+
+    Args:
+    - values (pd.Series): Column to bound.
+
+    Returns:
+    - tuple: (lower, upper) = (Q25 - 1.5 * IQR, Q75 + 1.5 * IQR).
+    """
+    return iqr_bounds_from_quartiles(values.quantile(0.25), values.quantile(0.75))
+
+
+def iqr_bounds_from_quartiles(Q25, Q75):
+    """
+    Args:
+    - Q25 (float): First quartile of the column.
+    - Q75 (float): Third quartile of the column.
+
+    Returns:
+    - tuple: (lower, upper) = (Q25 - 1.5 * IQR, Q75 + 1.5 * IQR).
+    """
+    iqr = Q75- Q25
+    upper = Q75 + (1.5 * iqr)
+    lower = Q25 - (1.5 * iqr)
+    return lower, upper
+
+
+def drop_outliers(df, column, bounds=None):
+    """
+    Keep the rows strictly within the IQR bounds of a column.
+
+    Args:
+    - df (pd.DataFrame): Dataset returned by derive_columns.
+    - column (str): Column to filter on.
+    - bounds (tuple): (lower, upper) bounds. Computed from df when None.
+
+    Returns:
+    - pd.DataFrame: Filtered dataset.
+    """
+    lower, upper = iqr_bounds(df[column]) if bounds is None else bounds
+    return df[(df[column] > lower) & (df[column] < upper)]
+
+
+def partition_kind(values):
+    """
+    Summarize the dtype of a column of one part of a dataset, see combined_dtypes.
+
+    Args:
+    - values (pd.Series): Column of the part.
+
+    Returns:
+    - np.dtype or str: The integer dtype, "f" for floats, "b" for booleans, "none" for an
+      object column without any value, "O" for other object columns.
+    """
+    if values.dtype.kind in "iu":
+        return values.dtype
+    if values.dtype.kind in "fb":
+        return values.dtype.kind
+    return "none" if values.isna().all() else "O"
+
+
+def combined_dtypes(kinds):
+    """
+    Find the dtypes the columns would have had if the parts of a dataset were cleaned at once.
+
+    The steps of the cleaning pick the dtype of a column from its values, e.g.
+    a flag is int64 without missing values, float64 with some and object when
+    all are missing, and pd.to_numeric downcasts to the smallest integer dtype.
+
+    Args:
+    - kinds (dict): Set of the partition_kind() of each column over the parts.
+
+    Returns:
+    - dict: dtype of each column.
+    """
+    dtypes = {}
+    for column, column_kinds in kinds.items():
+        integers = [kind for kind in column_kinds if isinstance(kind, np.dtype)]
+        if len(integers) == len(column_kinds):
+            dtypes[column] = np.result_type(*integers)
+        elif column_kinds == {"b"}:
+            dtypes[column] = np.dtype(bool)
+        elif column_kinds <= set(integers) | {"f", "none"} and column_kinds != {"none"}:
+            dtypes[column] = np.dtype("float64")
+        else:
+            dtypes[column] = np.dtype(object)
+    return dtypes
+
+
+def finalize(df):
+    """
+    Capitalize the localities and add the price per square meter.
+
+    Args:
+    - df (pd.DataFrame): Dataset without outliers.
+
+    Returns:
+    - pd.DataFrame: Dataset of data_set_CLEAN.
+    """
+    df['Locality'] = df['Locality'].str.capitalize()
+    df['Price (sqm)'] = df['Price (euro)'] / df['Living surface (sqm)']
+    return df
+
+
+def clean_dataframe(df):
+    """
+    Clean the raw dataset (inner aggregation, conversion, renaming).
+
+    Args:
+    - df (pd.DataFrame): Raw dataset, as read from data_set_RAW.csv.
+
+    Returns:
+    - pd.DataFrame: Cleaned dataset.
+    """
+    df = drop_invalid_rows(df)
+    df = normalize_columns(df)
+    df = derive_columns(df)
+
+    # Drop outliers
+    for column in OUTLIER_COLUMNS:
+        df = drop_outliers(df, column)
+    return finalize(df)
@@ -0,0 +1,122 @@
+"""
+Columnar (Parquet) output of the raw and clean datasets.
+
+String columns are stored dictionary-encoded and come back as pandas
+categoricals, each file keeps min/max statistics per row group, and the
+clean dataset is partitioned by region/province. load_dataset() reads
+only the requested columns and uses the partitions and the row group
+statistics to skip the data a filter excludes.
+"""
+import os
+import shutil
+
+import pandas as pd
+
+# pyarrow is only needed for the Parquet output, import it lazily
+
+
+PARTITION_COLUMNS = ["region", "province"]
+ROW_GROUP_SIZE = 64 * 1024
+# Unique per classified, dictionary-encoding them would only add overhead
+PLAIN_STRING_COLUMNS = ["URL", "url"]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("The Parquet output needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def categorical_columns(df):
+    """
+    Pick the columns stored dictionary-encoded.
+
+    Args:
+    - df (pd.DataFrame): Dataset to write.
+
+    Returns:
+    - list: String columns with repeated values, e.g. Kitchen type, Energy class or Heating type.
+    """
+    return [
+        column for column in df.columns
+        if column not in PLAIN_STRING_COLUMNS
+        and (df[column].dtype == object or isinstance(df[column].dtype, pd.CategoricalDtype))
+    ]
+
+
+def _arrow_table(df):
+    pa = _pyarrow()
+    df = df.copy()
+    for column in categorical_columns(df):
+        values = df[column]
+        if values.dtype == object:
+            # Mixed columns (e.g. years scraped as text) are stored as their string form
+            values = values.where(values.isna(), values.astype(str))
+        df[column] = values.astype("category")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_dataset(df, path, partition_cols=None, row_group_size=ROW_GROUP_SIZE):
+    """
+    Write a dataset to Parquet, replacing any previous version.
+
+    Args:
+    - df (pd.DataFrame): Dataset to write.
+    - path (str): Parquet file, or directory when the dataset is partitioned.
+    - partition_cols (list): Columns partitioning the dataset into region=.../province=... directories.
+    - row_group_size (int): Maximum number of rows per row group.
+    """
+    pa = _pyarrow()
+    table = _arrow_table(df)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if partition_cols:
+        pa.parquet.write_to_dataset(
+            table,
+            path,
+            partition_cols=partition_cols,
+            compression="zstd",
+            row_group_size=row_group_size,
+        )
+    else:
+        pa.parquet.write_table(table, path, compression="zstd", row_group_size=row_group_size)
+
+
+def load_dataset(path, columns=None, filters=None):
+    """
+    Load a dataset written by write_dataset.
+
+    Args:
+    - path (str): Parquet file or partitioned directory.
+    - columns (list): Columns to read. Defaults to all of them.
+    - filters (list): Row filters pushed down to the reader, in the pyarrow format,
+      e.g. [("region", "=", "Flanders"), ("Price (euro)", "<", 300000)].
+
+    Returns:
+    - pd.DataFrame: Dataset, string columns as categoricals.
+    """
+    pa = _pyarrow()
+    import pyarrow.dataset
+
+    # Partition values are read as plain strings: pyarrow cannot turn a partition
+    # dictionary holding nulls (e.g. an unknown province) into a categorical
+    partitioning = pa.dataset.HivePartitioning.discover(infer_dictionary=False)
+    table = pa.parquet.read_table(path, columns=columns, filters=filters, partitioning=partitioning)
+    df = table.to_pandas()
+    for column in PARTITION_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = df[column].astype("category")
+    if columns is not None:
+        # Partition columns are appended by the reader: keep the requested order
+        df = df[list(columns)]
+    else:
+        order = table.schema.pandas_metadata and [c["name"] for c in table.schema.pandas_metadata["columns"]]
+        if order and set(order) >= set(df.columns):
+            df = df[[column for column in order if column in df.columns]]
+    return df
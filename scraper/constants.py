@@ -0,0 +1,17 @@
+"""
+Constants shared by modules that must not depend on each other's imports,
+e.g. the SQLite store and the pandas cleaning stack.
+"""
+
+# Subtypes of property (URL segment) counted as apartments, every other one as a house
+APARTMENT_SUBTYPES = [
+    "apartment",
+    "loft",
+    "penthouse",
+    "duplex",
+    "ground-floor",
+    "flat-studio",
+    "service-flat",
+    "kot",
+    "triplex",
+]
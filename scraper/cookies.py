@@ -0,0 +1,74 @@
+import json
+import os
+import time
+
+
+class CookieJarCache:
+    """
+    Cookies of the last Immoweb session, persisted between runs.
+
+    Reusing them skips the browser cookie stores (slow to decrypt) and the
+    homepage visit. Cookies are dropped once expired; cookies without an
+    expiry date (browser-session cookies) are kept for session_max_age after
+    they were saved.
+    """
+
+    def __init__(self, path="data/cookies.json", session_max_age=12 * 60 * 60) -> None:
+        """
+        Initialize the CookieJarCache object.
+
+        Args:
+        - path (str): JSON file holding the cookies.
+        - session_max_age (float): Seconds a cookie without expiry date stays usable.
+        """
+        self.path = path
+        self.session_max_age = session_max_age
+
+    def load(self, jar):
+        """
+        Copy the saved cookies that are still valid into a cookie jar.
+
+        Args:
+        - jar (http.cookiejar.CookieJar): Jar receiving the cookies, e.g. session.cookies.
+
+        Returns:
+        - int: Number of cookies loaded, 0 if there is no usable saved session.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        now = time.time()
+        # The browser session the cookies without expiry date belong to is over
+        session_over = now - saved.get("saved_at", 0) > self.session_max_age
+        loaded = 0
+        for cookie in saved.get("cookies", []):
+            if cookie["expires"] is None:
+                if session_over:
+                    continue
+            elif cookie["expires"] <= now:
+                continue
+            jar.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"],
+                    expires=cookie["expires"], secure=cookie["secure"])
+            loaded += 1
+        return loaded
+
+    def save(self, jar):
+        """
+        Save the cookies of a jar, atomically.
+
+        Args:
+        - jar (http.cookiejar.CookieJar): Jar to save, e.g. session.cookies.
+        """
+        cookies = [
+            {"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path,
+             "expires": cookie.expires, "secure": cookie.secure}
+            for cookie in jar
+        ]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Worker processes of a distributed crawl share the file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "cookies": cookies}, f)
+        os.replace(tmp_path, self.path)
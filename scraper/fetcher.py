@@ -0,0 +1,336 @@
+import asyncio
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from scraper.transport import POOL_SIZE, async_client
+
+
+MAX_RETRIES = 3
+
+_DONE = object()
+
+
+def blocked_wait(attempt):
+    """
+    Seconds to wait after a 403 before the next attempt.
+
+    Args:
+    - attempt (int): Zero-based attempt number that was blocked.
+    """
+    return (attempt + 1) * 5 + random.uniform(2, 5)
+
+
+def error_wait(attempt):
+    """
+    Seconds to wait after a network error before the next attempt.
+
+    Args:
+    - attempt (int): Zero-based attempt number that failed.
+    """
+    return (attempt + 1) * 3 + random.uniform(1, 3)
+
+
+def _observe(metrics, response, latency):
+    metrics.requests.inc(status=response.status_code)
+    metrics.fetch_latency.observe(latency)
+    if response.status_code == 200:
+        metrics.downloaded_bytes.inc(len(response.content))
+
+
+def _backoff(seconds, rate):
+    # With a rate controller the pause applies to every request, not only this one
+    if rate is not None:
+        rate.pause(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def fetch(session, url, max_retries=MAX_RETRIES, cache=None, delay=None, rate=None, metrics=None):
+    """
+    Fetch a URL with the scraper's retry and 403 handling.
+
+    Args:
+    - session (requests.Session): Session used for the request.
+    - url (str): URL to fetch.
+    - max_retries (int): Number of attempts before giving up.
+    - cache (ResponseCache): Optional response cache. Fresh entries are returned without a request.
+    - delay (tuple): Range of the random pause taken before going to the network.
+    - rate (RateController): Adaptive rate shared by the requests, replaces delay when given.
+    - metrics (Metrics): Run metrics receiving the status codes, retries, latencies and sizes.
+
+    Returns:
+    - bytes: Response body, or None if the URL could not be fetched.
+    """
+    entry = cache.lookup(url) if cache is not None else None
+    if entry is not None and entry.fresh:
+        if metrics is not None:
+            metrics.cache_hits.inc()
+        return entry.body
+    headers = cache.conditional_headers(entry) if cache is not None else {}
+
+    if delay and rate is None:
+        time.sleep(random.uniform(*delay))
+
+    for attempt in range(max_retries):
+        if rate is not None:
+            rate.acquire()
+        start = time.monotonic()
+        retry_after = None
+        observed = False
+        response = None
+        try:
+            response = session.get(url, headers=headers, timeout=15, allow_redirects=True)
+            if metrics is not None:
+                _observe(metrics, response, time.monotonic() - start)
+            if rate is not None:
+                retry_after = rate.observe(response.status_code, time.monotonic() - start,
+                                           response.headers.get("Retry-After"))
+                observed = True
+
+            if response.status_code == 304 and entry is not None:
+                cache.revalidated(url, response.headers)
+                return entry.body
+
+            # Check if we got blocked
+            if response.status_code == 403:
+                if attempt < max_retries - 1:
+                    wait_time = retry_after or blocked_wait(attempt)
+                    if metrics is not None:
+                        metrics.retries.inc(reason="403")
+                    print(f"Got 403 for {url}, waiting {wait_time:.1f}s before retry {attempt + 1}/{max_retries}")
+                    _backoff(wait_time, rate)
+                    continue
+                else:
+                    print(f"Error accessing {url}: 403 Forbidden (blocked after {max_retries} attempts)")
+                    return None
+
+            response.raise_for_status()
+            if cache is not None:
+                cache.store(url, response.content, response.headers)
+            return response.content
+        except requests.exceptions.RequestException as e:
+            if rate is not None and not observed:
+                rate.observe(None, time.monotonic() - start)
+            if metrics is not None and response is None:
+                metrics.requests.inc(status="error")
+            if attempt < max_retries - 1:
+                wait_time = retry_after or error_wait(attempt)
+                if metrics is not None:
+                    metrics.retries.inc(reason="error")
+                print(f"Error accessing {url} (attempt {attempt + 1}/{max_retries}): {e}, retrying in {wait_time:.1f}s")
+                _backoff(wait_time, rate)
+            else:
+                print(f"Error accessing {url}: {e} (failed after {max_retries} attempts)")
+                return None
+    return None
+
+
+class _HostLimit:
+    # Semaphore whose size follows the concurrency suggested by the rate controller
+    def __init__(self, limit, rate):
+        self.limit = limit
+        self.rate = rate
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    def _available(self):
+        limit = self.limit if self.rate is None else min(self.limit, self.rate.concurrency)
+        return self.in_flight < limit
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(self._available)
+            self.in_flight += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+
+class AsyncFetcher:
+    """
+    Fetch many URLs concurrently with asyncio and httpx.
+
+    Requests to the same host never exceed max_per_host in flight, nor the
+    concurrency suggested by the rate controller when there is one, and every
+    request goes through the same retry and 403 policy as fetch().
+    """
+
+    def __init__(self, session, max_per_host=4, delay=(0.5, 2), max_retries=MAX_RETRIES, cache=None,
+                 rate=None, pool_size=POOL_SIZE, http2=False, metrics=None) -> None:
+        """
+        Initialize the AsyncFetcher object.
+
+        Args:
+        - session (requests.Session): Session whose headers and cookies are reused.
+        - max_per_host (int): Maximum number of concurrent requests per host.
+        - delay (tuple): Range of the random pause taken before each request.
+        - max_retries (int): Number of attempts per URL before giving up.
+        - cache (ResponseCache): Optional response cache shared with the sequential mode.
+        - rate (RateController): Adaptive rate shared by the requests, replaces delay when given.
+        - pool_size (int): Number of kept-alive connections of the client.
+        - http2 (bool): Multiplex the requests over HTTP/2 when the h2 package is installed.
+        - metrics (Metrics): Run metrics receiving the status codes, retries, latencies and sizes.
+        """
+        self.session = session
+        self.max_per_host = max_per_host
+        self.delay = delay
+        self.max_retries = max_retries
+        self.cache = cache
+        self.rate = rate
+        self.pool_size = max(pool_size, max_per_host)
+        self.http2 = http2
+        self.metrics = metrics
+        self._host_limits = {}
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = _HostLimit(self.max_per_host, self.rate)
+        return self._host_limits[host]
+
+    def _backoff(self, seconds):
+        if self.rate is not None:
+            self.rate.pause(seconds)
+            return asyncio.sleep(0)
+        return asyncio.sleep(seconds)
+
+    async def _fetch(self, client, url):
+        import httpx
+
+        entry = self.cache.lookup(url) if self.cache is not None else None
+        if entry is not None and entry.fresh:
+            if self.metrics is not None:
+                self.metrics.cache_hits.inc()
+            return entry.body
+        headers = self.cache.conditional_headers(entry) if self.cache is not None else {}
+
+        async with self._host_limit(url):
+            if self.rate is None:
+                await asyncio.sleep(random.uniform(*self.delay))
+            for attempt in range(self.max_retries):
+                if self.rate is not None:
+                    await asyncio.sleep(self.rate.reserve())
+                start = time.monotonic()
+                retry_after = None
+                observed = False
+                response = None
+                try:
+                    response = await client.get(url, headers=headers)
+                    if self.metrics is not None:
+                        _observe(self.metrics, response, time.monotonic() - start)
+                    if self.rate is not None:
+                        retry_after = self.rate.observe(response.status_code, time.monotonic() - start,
+                                                        response.headers.get("Retry-After"))
+                        observed = True
+
+                    if response.status_code == 304 and entry is not None:
+                        self.cache.revalidated(url, response.headers)
+                        return entry.body
+
+                    if response.status_code == 403:
+                        if attempt < self.max_retries - 1:
+                            wait_time = retry_after or blocked_wait(attempt)
+                            if self.metrics is not None:
+                                self.metrics.retries.inc(reason="403")
+                            print(f"Got 403 for {url}, waiting {wait_time:.1f}s before retry {attempt + 1}/{self.max_retries}")
+                            await self._backoff(wait_time)
+                            continue
+                        else:
+                            print(f"Error accessing {url}: 403 Forbidden (blocked after {self.max_retries} attempts)")
+                            return None
+
+                    response.raise_for_status()
+                    if self.cache is not None:
+                        self.cache.store(url, response.content, response.headers)
+                    return response.content
+                except httpx.HTTPError as e:
+                    if self.rate is not None and not observed:
+                        self.rate.observe(None, time.monotonic() - start)
+                    if self.metrics is not None and response is None:
+                        self.metrics.requests.inc(status="error")
+                    if attempt < self.max_retries - 1:
+                        wait_time = retry_after or error_wait(attempt)
+                        if self.metrics is not None:
+                            self.metrics.retries.inc(reason="error")
+                        print(f"Error accessing {url} (attempt {attempt + 1}/{self.max_retries}): {e}, retrying in {wait_time:.1f}s")
+                        await self._backoff(wait_time)
+                    else:
+                        print(f"Error accessing {url}: {e} (failed after {self.max_retries} attempts)")
+                        return None
+            return None
+
+    async def _fetch_all(self, urls):
+        self._host_limits = {}
+        async with async_client(self.session, self.pool_size, self.http2) as client:
+            return await asyncio.gather(*(self._fetch(client, url) for url in urls))
+
+    def fetch_all(self, urls):
+        """
+        Fetch every URL concurrently.
+
+        Args:
+        - urls (list): URLs to fetch.
+
+        Returns:
+        - list: Response bodies in the same order as urls, None for failures.
+        """
+        return asyncio.run(self._fetch_all(urls))
+
+    async def _stream(self, urls, results, slots):
+        self._host_limits = {}
+        loop = asyncio.get_running_loop()
+        pending = set()
+
+        async def fetch_one(client, url):
+            results.put((url, await self._fetch(client, url)))
+
+        try:
+            async with async_client(self.session, self.pool_size, self.http2) as client:
+                for url in urls:
+                    # Wait for the consumer to free a slot so that fetched but
+                    # unconsumed bodies never exceed the window
+                    await loop.run_in_executor(None, slots.acquire)
+                    task = asyncio.ensure_future(fetch_one(client, url))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                if pending:
+                    await asyncio.gather(*pending)
+        except Exception as e:
+            results.put(e)
+        results.put(_DONE)
+
+    def iter_fetch(self, urls, window=None):
+        """
+        Fetch URLs concurrently and yield each body as soon as it arrives.
+
+        At most window bodies are in flight or waiting to be consumed, so
+        memory stays flat whatever the number of URLs.
+
+        Args:
+        - urls (iterable): URLs to fetch.
+        - window (int): Maximum number of bodies held at once. Defaults to 4 * max_per_host.
+
+        Yields:
+        - tuple: (url, body) in completion order, body is None for failures.
+        """
+        window = window or self.max_per_host * 4
+        results = queue.Queue()
+        slots = threading.Semaphore(window)
+        worker = threading.Thread(target=lambda: asyncio.run(self._stream(urls, results, slots)), daemon=True)
+        worker.start()
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            slots.release()
+            yield item
+        worker.join()
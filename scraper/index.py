@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+def property_id(url):
+    """
+    Extract the Property ID from an Immoweb URL (its last path segment).
+
+    Args:
+    - url (str): Classified URL.
+
+    Returns:
+    - str: Property ID.
+    """
+    return url.split('/')[-1]
+
+
+def fingerprint(record):
+    """
+    Compute a stable fingerprint of a scraped record.
+
+    Args:
+    - record (dict): Scraped record.
+
+    Returns:
+    - str: SHA-1 hex digest of the record content.
+    """
+    payload = json.dumps(record, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class PropertyIndex:
+    """
+    Persistent index of the classifieds already scraped, keyed on Property ID.
+
+    For each classified it keeps when it was first and last seen on a search
+    page, when its detail page was last fetched and a fingerprint of the last
+    record, so that incremental crawls only fetch new or outdated classifieds.
+    """
+
+    def __init__(self, path="data/property_index.sqlite") -> None:
+        """
+        Initialize the PropertyIndex object.
+
+        Args:
+        - path (str): SQLite database file.
+        """
+        self.path = path
+        # (property_id, url, fetch time, fingerprint) of the records not saved yet
+        self._fetched = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS properties (
+                property_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                last_fetched REAL,
+                fingerprint TEXT
+            );
+        """)
+        self._db.commit()
+
+    def mark_seen(self, urls):
+        """
+        Record that classifieds were listed on a search page.
+
+        Args:
+        - urls (list): Classified URLs found on search pages.
+        """
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO properties (property_id, url, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(property_id) DO UPDATE SET url = excluded.url, last_seen = excluded.last_seen",
+                [(property_id(url), url, now, now) for url in urls],
+            )
+
+    def select_for_fetch(self, urls, refresh_after):
+        """
+        Keep the classifieds that were never fetched or were fetched too long ago.
+
+        Args:
+        - urls (list): Classified URLs found on search pages.
+        - refresh_after (float): Seconds after which a known classified is fetched again.
+
+        Returns:
+        - list: URLs to fetch, in their original order.
+        """
+        cutoff = time.time() - refresh_after
+        fetched = {}
+        ids = list({property_id(url) for url in urls})
+        # Stay below SQLite's limit on the number of bound parameters
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT property_id, last_fetched FROM properties WHERE property_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            fetched.update(rows)
+        return [url for url in urls if fetched.get(property_id(url)) is None or fetched[property_id(url)] < cutoff]
+
+    def record_fetched(self, record):
+        """
+        Stage the fingerprint of a freshly scraped record, stored by commit_fetched().
+
+        Args:
+        - record (dict): Scraped record.
+
+        Returns:
+        - bool: True if the record is new or changed since the previous fetch.
+        """
+        new_fingerprint = fingerprint(record)
+        pid = record["Property ID"]
+        row = self._db.execute("SELECT fingerprint FROM properties WHERE property_id = ?", (pid,)).fetchone()
+        self._fetched.append((pid, record["url"], time.time(), new_fingerprint))
+        return row is None or row[0] != new_fingerprint
+
+    def commit_fetched(self):
+        """
+        Store the records staged by record_fetched(), once they are saved in the raw dataset.
+
+        A classified is only skipped by the next incremental runs once it is
+        committed, so that a run interrupted before writing its records fetches
+        them again.
+
+        Returns:
+        - int: Number of records stored.
+        """
+        fetched, self._fetched = self._fetched, []
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO properties (property_id, url, first_seen, last_seen, last_fetched, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(property_id) DO UPDATE SET last_fetched = excluded.last_fetched, "
+                "fingerprint = excluded.fingerprint",
+                [(pid, url, now, now, now, new_fingerprint) for pid, url, now, new_fingerprint in fetched],
+            )
+        return len(fetched)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+
+
+class CrawlJournal:
+    """
+    Append-only JSONL journal of a crawl.
+
+    Every completed search page (with the classified URLs found on it) and
+    every parsed record is appended as one line as soon as it is available,
+    so that an interrupted crawl can be resumed without fetching those pages
+    again. Lines are flushed one by one and synced to disk every sync_every
+    lines; a line torn by a crash is dropped when the journal is replayed.
+
+    search_pages and records only hold what was replayed on resume: the
+    pages and records journaled by this run are written to disk, not kept.
+    """
+
+    def __init__(self, path="data/crawl_journal.jsonl", resume=False, sync_every=50) -> None:
+        """
+        Initialize the CrawlJournal object.
+
+        Args:
+        - path (str): JSONL file of the journal.
+        - resume (bool): Replay the existing journal and keep appending to it. Otherwise it is started afresh.
+        - sync_every (int): Number of lines between two fsync calls.
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.search_pages = {}
+        self.records = {}
+        self._unsynced = 0
+        # Search pages and records may be journaled from different threads
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if resume and os.path.exists(path):
+            self._replay()
+            print(f"Resuming from {path}: {len(self.search_pages)} search pages and {len(self.records)} records already done")
+        else:
+            open(path, "w").close()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self):
+        good_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry.get("type") == "search":
+                    self.search_pages[entry["url"]] = entry["links"]
+                elif entry.get("type") == "record":
+                    self.records[entry["url"]] = entry["record"]
+                good_size += len(line)
+        if good_size != os.path.getsize(self.path):
+            # Drop the line the crash was writing, new lines must not be glued to it
+            print(f"Warning: dropping an incomplete line at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_size)
+
+    def _write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def search_page(self, url, links):
+        """
+        Record a completed search page.
+
+        Args:
+        - url (str): Base URL of the search page.
+        - links (list): Classified URLs found on the page.
+        """
+        self._write({"type": "search", "url": url, "links": list(links)})
+
+    def record(self, url, record):
+        """
+        Record a parsed classified.
+
+        Args:
+        - url (str): Classified URL.
+        - record (dict): Scraped record.
+        """
+        self._write({"type": "record", "url": url, "record": record})
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
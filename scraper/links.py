@@ -0,0 +1,68 @@
+from lxml import etree
+
+from scraper.parser import parse_document
+from scraper.urls import unique_urls
+
+
+# Paths of classified pages, as opposed to search, project or navigation pages
+CLASSIFIED_PATHS = ("/property/", "/en/classified/", "/fr/classified/", "/nl/classified/")
+
+# Classes of the result card links, in order of preference. Anchors whose class
+# mentions both "card" and "link" come after them
+LINK_CLASSES = ("card__title-link", "card-title-link", "search-result__title-link", "property-link")
+
+
+def _absolute(href):
+    return f"https://www.immoweb.be{href}" if href.startswith("/") else href
+
+
+def _class_rank(classes):
+    # Index of the first class selector the anchor matches, None if it matches none
+    tokens = classes.split()
+    for rank, link_class in enumerate(LINK_CLASSES):
+        if link_class in tokens:
+            return rank
+    lowered = classes.lower()
+    if "card" in lowered and "link" in lowered:
+        return len(LINK_CLASSES)
+    return None
+
+
+def extract_property_links(content):
+    """
+    Extract the classified URLs of a search page in a single pass over its anchors.
+
+    Every anchor is tested once against both rules of the previous
+    BeautifulSoup extractor: an absolute or root-relative href pointing to a
+    classified page, or a result card class with an href on immoweb.be. New
+    real estate projects are left out. The URLs are ordered as that extractor
+    ordered them (href matches first, then class matches by selector), so the
+    same variant of each classified is kept.
+
+    Args:
+    - content (bytes): HTML of the search page.
+
+    Returns:
+    - list: Canonical classified URLs, one per classified.
+    """
+    try:
+        tree = parse_document(content)
+    except (etree.ParserError, ValueError):
+        return []
+    by_href = []
+    by_class = [[] for _ in range(len(LINK_CLASSES) + 1)]
+    for anchor in tree.iter("a"):
+        href = anchor.get("href")
+        if not href:
+            continue
+        url = _absolute(href)
+        if "immoweb.be" not in url or "new-real-estate-project" in url:
+            continue
+        if url.startswith("http") and any(path in url for path in CLASSIFIED_PATHS):
+            by_href.append(url)
+        classes = anchor.get("class")
+        if classes:
+            rank = _class_rank(classes)
+            if rank is not None:
+                by_class[rank].append(url)
+    return unique_urls(by_href + [url for urls in by_class for url in urls])
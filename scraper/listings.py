@@ -0,0 +1,101 @@
+import html
+import json
+import re
+
+from scraper.parser import payload_value
+from scraper.urls import property_key
+
+
+# Search pages embed their results as JSON in the :results attribute of the
+# <iw-search> element, HTML-escaped
+_RESULTS_ATTRIBUTE = re.compile(r"<iw-search\b[^>]*?\s:results=(\"[^\"]*\"|'[^']*')", re.IGNORECASE)
+
+# Record fields available on a search page, with their path in a result of
+# the payload. Values have the same representation as in the detail page table
+LISTING_FIELDS = {
+    "Price": ("price", "mainValue"),
+    "Bedrooms": ("property", "bedroomCount"),
+    "Living area": ("property", "netHabitableSurface"),
+}
+# Fields copied when the result has them, e.g. apartments have no plot
+OPTIONAL_LISTING_FIELDS = {
+    "Surface of the plot": ("property", "landSurface"),
+}
+
+
+def search_results(content):
+    """
+    Read the results payload of a search page.
+
+    Args:
+    - content (bytes): HTML of the search page.
+
+    Returns:
+    - list: Result objects, empty if the page has no readable payload.
+    """
+    text = content.decode("utf-8", errors="replace") if isinstance(content, bytes) else content
+    match = _RESULTS_ATTRIBUTE.search(text)
+    if match is None:
+        return []
+    try:
+        results = json.loads(html.unescape(match.group(1)[1:-1]))
+    except ValueError:
+        return []
+    return [result for result in results if isinstance(result, dict)] if isinstance(results, list) else []
+
+
+def listing_record(url, result):
+    """
+    Build the partial record of a classified from its search result.
+
+    The fields taken from the URL are the ones parse_classified takes from it;
+    Open Fire is only known from the detail page and stays None.
+
+    Args:
+    - url (str): Classified URL found on the search page.
+    - result (dict): Search result of the classified.
+
+    Returns:
+    - dict: Partial record, or None if one of the LISTING_FIELDS is missing.
+    """
+    parts = url.split('/')
+    record = {
+        "url": url,
+        "Property ID": parts[-1],
+        "Locality name": parts[-3],
+        "Postal code": parts[-2],
+        "Subtype of property": parts[-5],
+        "Open Fire": None,
+    }
+    for field, path in LISTING_FIELDS.items():
+        value = payload_value(result, path)
+        if value is None:
+            return None
+        record[field] = value
+    for field, path in OPTIONAL_LISTING_FIELDS.items():
+        value = payload_value(result, path)
+        if value is not None:
+            record[field] = value
+    return record
+
+
+def search_listings(content, urls):
+    """
+    Match the results payload of a search page with the classified URLs found on it.
+
+    Args:
+    - content (bytes): HTML of the search page.
+    - urls (list): Canonical classified URLs extracted from the page.
+
+    Returns:
+    - dict: Partial record per URL, for the classifieds whose result has every listing field.
+    """
+    results = {str(result.get("id")): result for result in search_results(content)}
+    listings = {}
+    for url in urls:
+        result = results.get(property_key(url))
+        if result is not None:
+            record = listing_record(url, result)
+            if record is not None:
+                listings[url] = record
+    return listings
@@ -0,0 +1,255 @@
+"""
+Run metrics of the scraper: counters and histograms per stage.
+
+They are exposed in the OpenMetrics text format on an optional local
+/metrics HTTP endpoint (scrapable by Prometheus) and written as a JSON
+summary at the end of a run.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()) -> None:
+        """
+        Initialize the Counter object.
+
+        Args:
+        - name (str): Metric name, without the _total suffix.
+        - help (str): Description.
+        - labels (tuple): Label names.
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """
+        Returns:
+        - float: Value for the given labels, or the total over every label value when none is given.
+        """
+        with self._lock:
+            if not labels:
+                return sum(self._values.values())
+            return self._values.get(tuple(str(labels[name]) for name in self.labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}_total{_label_text(self.labels, key)} {_number(value)}" for key, value in values]
+
+    def summary(self):
+        with self._lock:
+            if not self.labels:
+                return self._values.get((), 0)
+            return {",".join(key): value for key, value in sorted(self._values.items())}
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets, optionally split by labels.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets, labels=()) -> None:
+        """
+        Initialize the Histogram object.
+
+        Args:
+        - name (str): Metric name.
+        - help (str): Description.
+        - buckets (tuple): Increasing upper bounds, +Inf is added.
+        - labels (tuple): Label names.
+        """
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the time spent in a with block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                labels = _label_text(self.labels + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_number(total)}")
+        return lines
+
+    def summary(self):
+        with self._lock:
+            series = {key: (sum(counts), total) for key, (counts, total) in self._series.items()}
+        result = {
+            ",".join(key): {"count": count, "sum": round(total, 6), "mean": round(total / count, 6) if count else None}
+            for key, (count, total) in sorted(series.items())
+        }
+        return result.get("", {"count": 0, "sum": 0.0, "mean": None}) if not self.labels else result
+
+
+class Metrics:
+    """
+    Metrics of one scraper run.
+    """
+
+    def __init__(self) -> None:
+        self.requests = Counter("immoweb_requests", "HTTP responses by status code, error for network errors",
+                                ("status",))
+        self.retries = Counter("immoweb_retries", "Requests sent again, by reason (403, or error for network "
+                               "and HTTP errors)", ("reason",))
+        self.downloaded_bytes = Counter("immoweb_downloaded_bytes", "Bytes of response bodies downloaded")
+        self.cache_hits = Counter("immoweb_cache_hits", "Pages served by the response cache without a request")
+        self.fetch_latency = Histogram("immoweb_fetch_latency_seconds", "Latency of the HTTP requests",
+                                       LATENCY_BUCKETS)
+        self.parse_time = Histogram("immoweb_parse_seconds", "Time spent parsing a page, by page type",
+                                    PARSE_BUCKETS, ("page",))
+        self.records = Counter("immoweb_records", "Records produced, by source (detail, listing or journal)",
+                               ("source",))
+        self.dedup_hits = Counter("immoweb_dedup_hits", "Duplicates dropped, by stage (url or record)", ("stage",))
+        self.stage_time = Counter("immoweb_stage_seconds", "Wall time spent in each stage", ("stage",))
+        self.started = time.time()
+
+    @property
+    def metrics(self):
+        return [self.requests, self.retries, self.downloaded_bytes, self.cache_hits, self.fetch_latency,
+                self.parse_time, self.records, self.dedup_hits, self.stage_time]
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Add the time spent in a with block to a stage.
+
+        Args:
+        - name (str): Stage name, e.g. Clean_DataFrame.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_time.inc(time.perf_counter() - start, stage=name)
+
+    def render(self):
+        """
+        Returns:
+        - str: Every metric in the OpenMetrics text format.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Returns:
+        - dict: Metric values, keyed on their name.
+        """
+        summary = {"duration_seconds": round(time.time() - self.started, 3)}
+        for metric in self.metrics:
+            summary[metric.name] = metric.summary()
+        return summary
+
+    def write_json(self, path):
+        """
+        Write the summary to a JSON file.
+
+        Args:
+        - path (str): Output file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Expose the metrics on http://host:port/metrics from a background thread.
+
+        Args:
+        - port (int): TCP port, 0 picks a free one.
+        - host (str): Interface to listen on, local only by default.
+
+        Returns:
+        - ThreadingHTTPServer: Running server, call shutdown() to stop it.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes would flood the scraper's output
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Metrics available on http://{host}:{server.server_address[1]}/metrics")
+        return server
@@ -0,0 +1,63 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from scraper.parser import ELEMENT_LIST, parse_classified
+
+
+def _parse_page(each_url, content, element_list, use_payload):
+    return each_url, parse_classified(each_url, content, element_list, use_payload)
+
+
+class ParsePool:
+    """
+    Parse raw classified pages in a pool of worker processes.
+
+    Network I/O stays in the calling process; workers receive the raw bytes
+    and send back plain record dicts, so parsing scales with the number of
+    cores instead of being pinned to one by the GIL.
+    """
+
+    def __init__(self, workers=None, element_list=ELEMENT_LIST, window=None, use_payload=False) -> None:
+        """
+        Initialize the ParsePool object.
+
+        Args:
+        - workers (int): Number of parser processes. Defaults to the number of cores.
+        - element_list (list): Table headers to extract.
+        - window (int): Maximum number of pages submitted but not yet returned. Defaults to 4 * workers.
+        - use_payload (bool): Fill the numeric fields missing from the table with the embedded JSON payload.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.element_list = list(element_list)
+        self.window = window or self.workers * 4
+        self.use_payload = use_payload
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def imap(self, pages):
+        """
+        Parse pages in the worker processes.
+
+        Args:
+        - pages (iterable): (url, content) tuples, content being the raw HTML.
+
+        Yields:
+        - tuple: (url, record) in submission order, record is None if the page could not be parsed.
+        """
+        pending = deque()
+        for each_url, content in pages:
+            pending.append(self._executor.submit(_parse_page, each_url, content, self.element_list,
+                                                 self.use_payload))
+            if len(pending) >= self.window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
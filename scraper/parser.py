@@ -0,0 +1,204 @@
+import json
+
+from lxml import etree
+from lxml import html as lxml_html
+
+
+ELEMENT_LIST = ["Construction year","Bedrooms","Living area","Kitchen type","Furnished","Terrace surface",
+                "Surface of the plot","Garden surface","Number of frontages","Swimming pool","Building condition",
+                "Energy class","Tenement building","Flood zone type","Double glazing","Heating type","Bathrooms",
+                "Elevator","Accessible for disabled people","Outdoor parking spaces","Covered parking spaces","Shower rooms"]
+
+OPEN_FIRE_KEYWORDS = ["open haard", "cheminée", "feu ouvert", "open fire"]
+
+# Fields of the embedded window.classified payload that have the same
+# representation as the table value, e.g. 3 bedrooms is "3" in both
+PAYLOAD_FIELDS = {
+    "Construction year": ("property", "building", "constructionYear"),
+    "Bedrooms": ("property", "bedroomCount"),
+    "Living area": ("property", "netHabitableSurface"),
+    "Terrace surface": ("property", "terraceSurface"),
+    "Surface of the plot": ("property", "land", "surface"),
+    "Garden surface": ("property", "gardenSurface"),
+    "Number of frontages": ("property", "building", "facadeCount"),
+    "Bathrooms": ("property", "bathroomCount"),
+    "Shower rooms": ("property", "showerRoomCount"),
+}
+
+_HEADER_XPATH = etree.XPath(
+    "//th[contains(concat(' ', normalize-space(@class), ' '), ' classified-table__header ')]"
+)
+_PRICE_XPATH = etree.XPath(
+    "(//p[contains(concat(' ', normalize-space(@class), ' '), ' classified__price ')])[1]"
+)
+_DESCRIPTION_XPATH = etree.XPath("(//div[@id='classified-description-content-text'])[1]")
+_PAYLOAD_MARKER = "window.classified"
+
+
+def parse_document(content):
+    """
+    Parse the HTML of a page with lxml.
+
+    Args:
+    - content (bytes): Raw HTML.
+
+    Returns:
+    - lxml.html.HtmlElement: Root of the document.
+    """
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        from bs4 import UnicodeDammit
+
+        text = UnicodeDammit(content).unicode_markup
+    return lxml_html.document_fromstring(text)
+
+
+def _single_string(element):
+    # Same rule as BeautifulSoup's Tag.string: the text of an element whose
+    # only child is a string, or recursively a single child tag
+    children = list(element)
+    if not children:
+        return element.text
+    if len(children) == 1 and element.text is None and children[0].tail is None:
+        child = children[0]
+        if child.tag is etree.Comment:
+            return child.text
+        return _single_string(child)
+    return None
+
+
+def _cell_value(td):
+    # Text of the cell up to its first child tag, without spaces nor new lines,
+    # as the legacy str(td) slicing produced it (entities stay escaped)
+    text = td.text or ""
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text.replace("\n", "").replace(" ", "")
+
+
+def _payload(document_text):
+    start = document_text.find(_PAYLOAD_MARKER)
+    if start == -1:
+        return None
+    start = document_text.find("{", start)
+    if start == -1:
+        return None
+    try:
+        payload, _ = json.JSONDecoder().raw_decode(document_text, start)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def payload_value(payload, path):
+    """
+    Read a scalar of a JSON payload as the string the classified table would show.
+
+    Args:
+    - payload (dict): Decoded JSON payload.
+    - path (tuple): Keys leading to the value.
+
+    Returns:
+    - str: Value, or None if it is missing or not a scalar.
+    """
+    value = payload
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def parse_tree(each_url, tree, element_list=ELEMENT_LIST):
+    """
+    Extract the record of a classified from its parsed page.
+
+    Produces the same dictionary as Immoweb_Scraper.process_url, reading the
+    header -> value table in one pass.
+
+    Args:
+    - each_url (str): URL of the classified.
+    - tree (lxml.html.HtmlElement): Parsed page.
+    - element_list (list): Table headers to extract.
+
+    Returns:
+    - dict: Dictionary containing scraped data.
+    """
+    parts = each_url.split('/')
+    data_dict = {
+        "url": each_url,
+        "Property ID": parts[-1],
+        "Locality name": parts[-3],
+        "Postal code": parts[-2],
+        "Subtype of property": parts[-5],
+    }
+
+    description = _DESCRIPTION_XPATH(tree)
+    if not description:
+        data_dict["Open Fire"] = 0
+    else:
+        # The last paragraph decides, as in process_url
+        for tag in description[0].iter("p"):
+            text = tag.text_content().lower()
+            data_dict["Open Fire"] = 1 if any(keyword in text for keyword in OPEN_FIRE_KEYWORDS) else 0
+
+    price = _PRICE_XPATH(tree)
+    price_text = price[0].text_content() if price else ""
+    if price_text.startswith("€"):
+        data_dict["Price"] = price_text.split(' ')[0][1:].replace(',', '')
+    else:
+        data_dict["Price"] = 0
+
+    wanted = frozenset(element_list)
+    for th in _HEADER_XPATH(tree):
+        header = _single_string(th)
+        if header is None:
+            continue
+        header = header.strip()
+        if header not in wanted:
+            continue
+        row = th.getparent()
+        while row is not None and row.tag != "tr":
+            row = row.getparent()
+        if row is None:
+            continue
+        td = row.find(".//td")
+        if td is None:
+            continue
+        data_dict[header] = _cell_value(td)
+    return data_dict
+
+
+def parse_classified(each_url, content, element_list=ELEMENT_LIST, use_payload=False):
+    """
+    Parse the raw HTML of a classified into its record.
+
+    Args:
+    - each_url (str): URL of the classified.
+    - content (bytes): Raw HTML of the classified page.
+    - element_list (list): Table headers to extract.
+    - use_payload (bool): Fill the numeric fields missing from the table with the
+      values of the embedded window.classified JSON payload, when present.
+
+    Returns:
+    - dict: Dictionary containing scraped data, or None if the page cannot be parsed.
+    """
+    try:
+        tree = parse_document(content)
+    except (etree.ParserError, ValueError):
+        return None
+    data_dict = parse_tree(each_url, tree, element_list)
+    if use_payload:
+        scripts = [script.text for script in tree.iter("script") if script.text and _PAYLOAD_MARKER in script.text]
+        payload = _payload(scripts[0]) if scripts else None
+        if payload is not None:
+            for element, path in PAYLOAD_FIELDS.items():
+                if element in element_list and element not in data_dict:
+                    value = payload_value(payload, path)
+                    if value is not None:
+                        data_dict[element] = value
+    return data_dict
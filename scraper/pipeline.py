@@ -0,0 +1,180 @@
+import queue
+import threading
+
+from scraper.urls import unique_urls
+
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class CrawlPipeline:
+    """
+    Producer/consumer crawl of an Immoweb_Scraper.
+
+    Search-page discovery, selection of the classifieds to fetch and detail
+    fetching run at the same time, in threads linked by bounded queues:
+
+    - discovery fetches the search pages and extracts their classified URLs;
+    - selection drops the classifieds already found on an earlier page, applies
+      the journal, seen filter, incremental index and listings of the scraper,
+      and passes the records that need no detail page straight on;
+    - detail workers fetch the detail pages of the remaining classifieds.
+
+    Iterating the pipeline yields the records and raw detail pages as soon as
+    they are ready, so the first records come after the first search page
+    instead of after the last one. When a consumer falls behind, the full
+    queues hold the stages back.
+    """
+
+    def __init__(self, scraper, workers=1, queue_size=64) -> None:
+        """
+        Initialize the CrawlPipeline object.
+
+        Args:
+        - scraper (Immoweb_Scraper): Scraper whose session, cache, rate controller, journal,
+          index, seen filter and listings are used.
+        - workers (int): Number of detail pages fetched at the same time.
+        - queue_size (int): Capacity of the queues between the stages.
+        """
+        self.scraper = scraper
+        self.workers = max(1, workers)
+        self._found = queue.Queue(maxsize=16)
+        self._to_fetch = queue.Queue(maxsize=queue_size)
+        self._out = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _put(self, target, item):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, source):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _stage(self, target):
+        def run():
+            try:
+                target()
+            except _Stopped:
+                pass
+            except Exception as e:
+                # Raised again in the consumer
+                try:
+                    self._put(self._out, e)
+                except _Stopped:
+                    pass
+        return run
+
+    def _discover(self):
+        scraper = self.scraper
+        scraper.ensure_session()
+        scraper.base_urls_list = scraper.get_base_urls()
+        base_urls = []
+        for url in scraper.base_urls_list:
+            if scraper.journal is not None and url in scraper.journal.search_pages:
+                # Completed before the interruption, not fetched again
+                self._put(self._found, scraper.journal.search_pages[url])
+            else:
+                base_urls.append(url)
+
+        if scraper.concurrency > 1:
+            for url, url_content in scraper.async_fetcher().iter_fetch(base_urls):
+                if url_content is not None:
+                    links = scraper.extract_immoweb_urls(url, url_content)
+                    if scraper.journal is not None:
+                        scraper.journal.search_page(url, links)
+                    self._put(self._found, links)
+        else:
+            for url in base_urls:
+                self._put(self._found, scraper.get_immoweb_url(url))
+        self._put(self._found, _DONE)
+
+    def _select(self):
+        scraper = self.scraper
+        seen = set()
+        collected = 0
+        while True:
+            links = self._get(self._found)
+            if links is _DONE:
+                break
+            collected += len(links)
+            # A classified listed on several search pages is only fetched once
+            urls = unique_urls(links, seen)
+            scraper.metrics.dedup_hits.inc(len(links) - len(urls), stage="url")
+            scraper.immoweb_urls_list.extend(urls)
+            resumed, urls = scraper.split_resumed(urls)
+            for record in resumed:
+                self._put(self._out, ("resumed", record["url"], record))
+            urls = scraper.select_urls_to_fetch(urls)
+            if scraper.listings is not None:
+                listed, urls = scraper.split_listed(urls)
+                for url, record in listed:
+                    self._put(self._out, ("record", url, record))
+            for url in urls:
+                self._put(self._to_fetch, url)
+        print(f"Total URLs collected: {len(seen)} ({collected - len(seen)} duplicates dropped)")
+        for _ in range(self.workers):
+            self._put(self._to_fetch, _DONE)
+
+    def _fetch_details(self):
+        scraper = self.scraper
+        while True:
+            url = self._get(self._to_fetch)
+            if url is _DONE:
+                break
+            self._put(self._out, ("page", url, scraper.fetch_page(url)))
+        self._put(self._out, _DONE)
+
+    def __iter__(self):
+        """
+        Run the pipeline.
+
+        Yields:
+        - tuple: (kind, url, item). kind is "page" for a fetched detail page (item is its raw
+          HTML, None if it could not be fetched), "record" for a record built from a search page
+          and "resumed" for a record restored from the journal.
+        """
+        self._threads = [threading.Thread(target=self._stage(self._discover), daemon=True),
+                         threading.Thread(target=self._stage(self._select), daemon=True)]
+        self._threads += [threading.Thread(target=self._stage(self._fetch_details), daemon=True)
+                          for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        running = self.workers
+        while running:
+            item = self._out.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        self._stop.set()
+        for thread in self._threads:
+            # A stage stuck in a request notices the stop once the request is over,
+            # the threads are daemons so they never hold the process
+            thread.join(timeout=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
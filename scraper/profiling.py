@@ -0,0 +1,169 @@
+"""
+Per-stage CPU and allocation profiling of a scraper run (--profile).
+
+Each stage method of Immoweb_Scraper gets its own cProfile profiler and
+tracemalloc measurements. A stage called from another one (e.g.
+get_immoweb_urls_thread inside scrape_table_dataset) is profiled apart:
+the CPU stats of the outer stage leave it out, its memory figures include
+it. cProfile only sees the calling thread, so the work of the async fetch
+and pipeline threads shows up as time spent waiting for them.
+
+write_report() writes one <stage>.pstats file per stage (to open with
+pstats or snakeviz) and a summary.txt / summary.json of the top functions
+and top allocating lines of every stage.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class _StageStats:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.wall_time = 0.0
+        self.peak = 0
+        self.allocated = 0
+        self.allocators = {}
+
+
+class _Frame:
+    def __init__(self, stats, snapshot, start):
+        self.stats = stats
+        self.snapshot = snapshot
+        self.start = start
+        self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.peak = 0
+
+
+class StageProfiler:
+    """
+    cProfile stats and tracemalloc top allocators per stage.
+    """
+
+    def __init__(self, directory="data/profile", top=15, frames=1) -> None:
+        """
+        Initialize the StageProfiler object. Starts tracemalloc.
+
+        Args:
+        - directory (str): Directory of the report.
+        - top (int): Number of functions and allocating lines listed per stage.
+        - frames (int): Traceback depth tracemalloc keeps per allocation.
+        """
+        self.directory = directory
+        self.top = top
+        self.stages = {}
+        self._stack = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Profile a with block as (part of) a stage.
+
+        Args:
+        - name (str): Stage name.
+        """
+        if self._stack:
+            # The outer stage stops profiling while this one runs
+            outer = self._stack[-1]
+            outer.stats.profile.disable()
+            outer.peak = max(outer.peak, tracemalloc.get_traced_memory()[1])
+        stats = self.stages.setdefault(name, _StageStats())
+        frame = _Frame(stats, self._snapshot(), time.perf_counter())
+        self._stack.append(frame)
+        tracemalloc.reset_peak()
+        stats.profile.enable()
+        try:
+            yield
+        finally:
+            stats.profile.disable()
+            self._stack.pop()
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            stats.calls += 1
+            stats.wall_time += time.perf_counter() - frame.start
+            stats.peak = max(stats.peak, frame.peak - frame.memory_start)
+            stats.allocated += tracemalloc.get_traced_memory()[0] - frame.memory_start
+            for difference in self._snapshot().compare_to(frame.snapshot, "lineno"):
+                if difference.size_diff > 0:
+                    location = str(difference.traceback[0])
+                    size, count = stats.allocators.get(location, (0, 0))
+                    stats.allocators[location] = (size + difference.size_diff, count + difference.count_diff)
+            if self._stack:
+                outer = self._stack[-1]
+                outer.peak = max(outer.peak, frame.peak)
+                tracemalloc.reset_peak()
+                outer.stats.profile.enable()
+
+    def _top_functions(self, stats):
+        profile_stats = pstats.Stats(stats.profile)
+        rows = []
+        for (filename, line, function), (_, ncalls, tottime, cumtime, _) in profile_stats.stats.items():
+            rows.append({"function": f"{filename}:{line}({function})", "calls": ncalls,
+                         "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)})
+        rows.sort(key=lambda row: row["tottime"], reverse=True)
+        return rows[:self.top]
+
+    def summary(self):
+        """
+        Returns:
+        - dict: Per stage: calls, wall time, CPU time profiled, peak and net allocated memory,
+          top functions by own time and top allocating lines.
+        """
+        summary = {}
+        for name, stats in self.stages.items():
+            profiled = pstats.Stats(stats.profile).total_tt if stats.calls else 0.0
+            allocators = sorted(stats.allocators.items(), key=lambda item: item[1][0], reverse=True)[:self.top]
+            summary[name] = {
+                "calls": stats.calls,
+                "wall_time_s": round(stats.wall_time, 6),
+                "profiled_time_s": round(profiled, 6),
+                "peak_memory_mb": round(stats.peak / 2**20, 3),
+                "allocated_mb": round(stats.allocated / 2**20, 3),
+                "top_functions": self._top_functions(stats),
+                "top_allocators": [{"line": line, "size_kb": round(size / 1024, 1), "count": count}
+                                   for line, (size, count) in allocators],
+            }
+        return summary
+
+    def write_report(self):
+        """
+        Write the <stage>.pstats files, summary.json and summary.txt.
+
+        Returns:
+        - str: Directory of the report.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        summary = self.summary()
+        with open(os.path.join(self.directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        lines = []
+        for name, stats in self.stages.items():
+            stats.profile.dump_stats(os.path.join(self.directory, f"{name}.pstats"))
+            stage = summary[name]
+            lines.append(f"=== {name}: {stage['calls']} call(s), {stage['wall_time_s']:.3f}s wall, "
+                         f"{stage['profiled_time_s']:.3f}s profiled, peak {stage['peak_memory_mb']:.1f} MB, "
+                         f"net {stage['allocated_mb']:+.1f} MB")
+            text = io.StringIO()
+            pstats.Stats(stats.profile, stream=text).sort_stats("tottime").print_stats(self.top)
+            lines.append(text.getvalue().strip())
+            lines.append("Top allocating lines:")
+            lines.extend(f"  {allocator['size_kb']:>10.1f} KB {allocator['count']:>8} blocks  {allocator['line']}"
+                         for allocator in stage["top_allocators"])
+            lines.append("")
+        with open(os.path.join(self.directory, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        print(f"Profile written to {self.directory}/ (summary.txt, summary.json and one .pstats file per stage)")
+        return self.directory
@@ -0,0 +1,161 @@
+import email.utils
+import math
+import random
+import threading
+import time
+
+
+# Responses telling us to slow down
+THROTTLE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+
+    Args:
+    - value (str): Header value, a number of seconds or an HTTP date.
+
+    Returns:
+    - float: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RateController:
+    """
+    Adaptive request rate shared by every fetch of a scraper.
+
+    Requests are spaced by a token bucket refilled at the current rate.
+    The rate grows additively while responses come back quickly and is cut
+    multiplicatively on 403/429/5xx responses and network errors (AIMD), so
+    it settles at the highest rate the site accepts, capped at max_rate.
+    A Retry-After header pauses every request until it expires. The number
+    of requests worth keeping in flight follows from the rate and the
+    observed latency.
+    """
+
+    def __init__(self, initial_rate=0.5, min_rate=0.05, max_rate=2.0, increase=0.05, decrease=0.5,
+                 latency_target=2.0, max_concurrency=8, jitter=0.2, report_every=50) -> None:
+        """
+        Initialize the RateController object.
+
+        Args:
+        - initial_rate (float): Requests per second at start.
+        - min_rate (float): Lowest rate the controller backs off to.
+        - max_rate (float): Highest rate, the politeness cap.
+        - increase (float): Requests per second added after each fast successful response.
+        - decrease (float): Factor applied to the rate when the site pushes back.
+        - latency_target (float): Seconds above which responses no longer increase the rate.
+        - max_concurrency (int): Upper bound of the suggested number of requests in flight.
+        - jitter (float): Relative random variation of the interval between two requests.
+        - report_every (int): Print the current rate every that many requests, 0 disables it.
+        """
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.report_every = report_every
+        self.latency = None
+        self.requests = 0
+        self.throttled = 0
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Reserve the next request slot.
+
+        Returns:
+        - float: Seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until)
+            interval = 1.0 / self.rate
+            self._next_slot = slot + interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            return slot - now
+
+    def acquire(self):
+        """
+        Block until the next request may be sent.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Hold every request for a while, e.g. after a 403 or for a Retry-After header.
+
+        Args:
+        - seconds (float): Length of the pause.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe(self, status, latency, retry_after=None):
+        """
+        Adjust the rate from the outcome of a request.
+
+        Args:
+        - status (int): HTTP status code, None for a network error.
+        - latency (float): Seconds the request took.
+        - retry_after (str): Retry-After header of the response.
+
+        Returns:
+        - float: Seconds requested by Retry-After, or None.
+        """
+        wait = parse_retry_after(retry_after)
+        with self._lock:
+            self.requests += 1
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if status is None or status in THROTTLE_STATUSES:
+                self.throttled += 1
+                previous = self.rate
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                reason = "network error" if status is None else f"status {status}"
+                print(f"Rate controller: {reason}, slowing down from {previous:.2f} to {self.rate:.2f} requests/s")
+            elif latency <= self.latency_target:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            report = self.report_every and self.requests % self.report_every == 0
+        if wait is not None:
+            print(f"Rate controller: Retry-After asks to wait {wait:.1f}s")
+            self.pause(wait)
+        if report:
+            print(f"Rate controller: {self.status()}")
+        return wait
+
+    @property
+    def concurrency(self):
+        """
+        Suggested number of requests in flight: rate x latency (Little's law), at least 1.
+        """
+        if self.latency is None:
+            return 1
+        return max(1, min(self.max_concurrency, math.ceil(self.rate * self.latency)))
+
+    def status(self):
+        """
+        Returns:
+        - str: Current rate, concurrency and latency, for progress reports.
+        """
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "n/a"
+        return (f"{self.rate:.2f} requests/s, {self.concurrency} in flight, mean latency {latency}, "
+                f"{self.throttled} throttled out of {self.requests} requests")
@@ -0,0 +1,142 @@
+"""
+Compact in-memory collection of the scraped records.
+
+A scraped record is a dict of up to 30 string keys, most of its values are
+short strings repeated from one classified to the next ("Yes", "Good",
+"Gas", ...) and every record is padded to the full schema before the
+DataFrame is built. At 100k+ classifieds the dicts dominate the memory of a
+run. RecordBuffer keeps one list per column of the schema instead, missing
+fields being implicit None, and stores a single copy of each repeated value
+of a column.
+"""
+# Unique per classified, interning them would only add overhead
+UNIQUE_COLUMNS = ("url", "Property ID")
+
+
+class RecordBuffer:
+    """
+    Column buffers holding the records of a scrape, with a fixed schema.
+
+    Behaves as a read-only sequence of records: len(), iteration and indexing
+    give dicts with every column of the schema, missing fields set to None.
+    """
+
+    def __init__(self, columns) -> None:
+        """
+        Initialize the RecordBuffer object.
+
+        Args:
+        - columns (list): Schema, e.g. Immoweb_Scraper.raw_columns. A record field outside
+          of it adds a column, None for the earlier records.
+        """
+        self.columns = []
+        self._positions = {}
+        self._values = []
+        self._interned = []
+        # hash of a record -> row, or list of rows when several records share the hash
+        self._rows_by_hash = {}
+        self._length = 0
+        for column in columns:
+            self._add_column(column)
+
+    def _add_column(self, column):
+        self._positions[column] = len(self.columns)
+        self.columns.append(column)
+        self._values.append([None] * self._length)
+        self._interned.append(None if column in UNIQUE_COLUMNS else {})
+
+    @staticmethod
+    def _key(record):
+        # A None field and a missing one are the same once in the buffer
+        return frozenset((field, value) for field, value in record.items() if value is not None)
+
+    def _rows(self, key_hash):
+        rows = self._rows_by_hash.get(key_hash)
+        if rows is None:
+            return []
+        return rows if isinstance(rows, list) else [rows]
+
+    def find(self, record):
+        """
+        Args:
+        - record (dict): Scraped record.
+
+        Returns:
+        - int: Row of an identical record, None if there is none.
+        """
+        return self._find(self._key(record))
+
+    def _find(self, key):
+        for row in self._rows(hash(key)):
+            if self._key(self[row]) == key:
+                return row
+        return None
+
+    def append(self, record, dedupe=True):
+        """
+        Add a record.
+
+        Args:
+        - record (dict): Scraped record.
+        - dedupe (bool): Skip the record if an identical one is already in the buffer.
+
+        Returns:
+        - bool: True if the record was added.
+        """
+        key = self._key(record)
+        if dedupe and self._find(key) is not None:
+            return False
+        for field in record:
+            if field not in self._positions:
+                self._add_column(field)
+        for position, column in enumerate(self.columns):
+            value = record.get(column)
+            interned = self._interned[position]
+            if interned is not None and isinstance(value, str):
+                value = interned.setdefault(value, value)
+            self._values[position].append(value)
+        key_hash = hash(key)
+        rows = self._rows_by_hash.get(key_hash)
+        if rows is None:
+            self._rows_by_hash[key_hash] = self._length
+        elif isinstance(rows, list):
+            rows.append(self._length)
+        else:
+            self._rows_by_hash[key_hash] = [rows, self._length]
+        self._length += 1
+        return True
+
+    def column(self, name):
+        """
+        Args:
+        - name (str): Column of the schema.
+
+        Returns:
+        - list: Values of the column, None for the records missing the field.
+        """
+        return self._values[self._positions[name]]
+
+    def to_frame(self):
+        """
+        Returns:
+        - pd.DataFrame: One row per record, the columns in schema order.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(dict(zip(self.columns, self._values)), columns=self.columns)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return {column: values[index] for column, values in zip(self.columns, self._values)}
+
+    def __iter__(self):
+        for row in zip(*self._values):
+            yield dict(zip(self.columns, row))
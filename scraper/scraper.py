@@ -1,11 +1,39 @@
-from concurrent.futures import ThreadPoolExecutor
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import functools
 import time
-import re
-import random
-import browser_cookie3
+import os
+
+# pandas, bs4 and browser_cookie3 are slow to import and not needed by every
+# job (e.g. single-page refreshes), they are imported where they are used
+from scraper.cache import ResponseCache
+from scraper.cookies import CookieJarCache
+from scraper.fetcher import AsyncFetcher, fetch
+from scraper.index import PropertyIndex
+from scraper.journal import CrawlJournal
+from scraper.links import extract_property_links
+from scraper.listings import search_listings
+from scraper.metrics import Metrics
+from scraper.parse_pool import ParsePool
+from scraper.parser import ELEMENT_LIST, OPEN_FIRE_KEYWORDS, parse_classified
+from scraper.pipeline import CrawlPipeline
+from scraper.profiling import StageProfiler
+from scraper.records import RecordBuffer
+from scraper.rate import RateController
+from scraper.store import PropertyStore
+from scraper.transport import POOL_SIZE, build_session
+from scraper.urls import BloomFilter, property_key, unique_urls
+
+
+def _stage(method):
+    # Adds the wall time of the method to the immoweb_stage_seconds metric,
+    # and profiles it when the scraper has a profiler
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        with self.metrics.stage(method.__name__):
+            if self.profiler is None:
+                return method(self, *args, **kwargs)
+            with self.profiler.stage(method.__name__):
+                return method(self, *args, **kwargs)
+    return timed
 
 
 class Immoweb_Scraper:
@@ -13,51 +41,108 @@ class Immoweb_Scraper:
     A class for scraping data from the Immoweb website.
     """
 
-    def __init__(self, numpages) -> None:
+    def __init__(self, numpages, concurrency=1, cache_dir=None, index_path=None, refresh_after=7 * 24 * 3600,
+                 connect=True, parse_workers=0, journal_path=None, resume=False, store_path=None,
+                 seen_filter_path=None, max_rate=2.0, pool_size=POOL_SIZE, http2=False, cookie_jar_path=None,
+                 listings=False, pipeline=False, profile_dir=None, use_payload=False) -> None:
         """
         Initialize the Immoweb_Scraper object.
         
         Args:
         - numpages (int): Number of pages to scrape.
+        - concurrency (int): Maximum concurrent requests per host. 1 keeps the sequential mode.
+        - cache_dir (str): Directory of the on-disk response cache. None disables caching.
+        - index_path (str): SQLite index of the classifieds already scraped. Setting it enables
+          the incremental mode, where only new or outdated classifieds are fetched.
+        - refresh_after (float): Seconds after which a known classified is fetched again in incremental mode.
+        - connect (bool): Load browser cookies and visit the homepage before the first request. False
+          gives an offline scraper, e.g. to parse or clean data that is already available.
+        - parse_workers (int): Number of parser processes. 0 parses pages in the scraping process.
+        - journal_path (str): JSONL journal recording the completed search pages and parsed records
+          as the crawl goes. None disables the journal.
+        - resume (bool): Reuse the search pages and records of the existing journal instead of fetching them again.
+        - store_path (str): SQLite inventory the scraped records are upserted into. None disables it.
+        - seen_filter_path (str): Bloom filter of the classifieds scraped by previous runs, which are
+          skipped and kept from the previous raw dataset. None disables it.
+        - max_rate (float): Highest number of requests per second the adaptive rate controller ramps up to.
+        - pool_size (int): Number of kept-alive connections per host.
+        - http2 (bool): Use HTTP/2 in async mode (needs the h2 package).
+        - cookie_jar_path (str): JSON file where the session cookies are kept between runs. While they
+          are valid, the browser cookies and the homepage visit are skipped. None disables it.
+        - listings (bool): Build the records from the results payload of the search pages (price,
+          bedrooms, living area and the URL fields). Detail pages are only fetched for the classifieds
+          whose search result lacks one of these fields.
+        - pipeline (bool): Fetch detail pages while the search pages are still being crawled, see
+          scraper.pipeline.CrawlPipeline. Records then come as soon as the first search page is done.
+          Pages are parsed as they arrive, so it cannot be combined with parse_workers.
+        - profile_dir (str): Profile every stage (cProfile and tracemalloc) and write the report to this
+          directory with profiler.write_report(). None disables profiling.
+        - use_payload (bool): Fill the numeric fields missing from the table of a detail page with the
+          values of its embedded window.classified JSON payload, see scraper.parser.parse_classified.
         """
+        if pipeline and parse_workers:
+            raise ValueError("pipeline parses pages as they arrive and cannot be combined with parse_workers")
         self.base_urls_list = []
         self.immoweb_urls_list = []
-        self.element_list = ["Construction year","Bedrooms","Living area","Kitchen type","Furnished","Terrace surface",
-                "Surface of the plot","Garden surface","Number of frontages","Swimming pool","Building condition",
-                "Energy class","Tenement building","Flood zone type","Double glazing","Heating type","Bathrooms",
-                "Elevator","Accessible for disabled people","Outdoor parking spaces","Covered parking spaces","Shower rooms"]
-        self.data_set = []
+        self.element_list = list(ELEMENT_LIST)
+        self.raw_columns = ["url", "Property ID", "Locality name", "Postal code", "Subtype of property", "Open Fire", "Price"] + self.element_list
+        self.data_set = RecordBuffer(self.raw_columns)
+        self.raw_df = None
         self.numpages = numpages
-        self.session = requests.Session()
-        
+        self.concurrency = concurrency
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.index = PropertyIndex(index_path) if index_path else None
+        self.refresh_after = refresh_after
+        self.parse_workers = parse_workers
+        self.use_payload = use_payload
+        self.journal = CrawlJournal(journal_path, resume) if journal_path else None
+        self.store = PropertyStore(store_path) if store_path else None
+        self.seen_filter_path = seen_filter_path
+        self.seen_filter = BloomFilter.load(seen_filter_path) if seen_filter_path else None
+        self.rate = RateController(max_rate=max_rate)
+        self.pool_size = pool_size
+        self.http2 = http2
+        # Headers are set once here: they must not be mutated later, the session is shared by concurrent fetches
+        self.session = build_session(pool_size)
+        self.cookie_jar = CookieJarCache(cookie_jar_path) if cookie_jar_path else None
+        # Partial records read from the search pages, per classified URL
+        self.listings = {} if listings else None
+        self.pipeline = pipeline
+        self.metrics = Metrics()
+        self.profiler = StageProfiler(profile_dir) if profile_dir else None
+        # The session is established lazily, by the first method going to the network
+        self.connect = connect
+        self._connected = False
+
+    def ensure_session(self):
+        """
+        Establish the session before the first request: reuse the saved cookies when they are
+        still valid, otherwise load the browser cookies and visit the homepage.
+        """
+        if not self.connect or self._connected:
+            return
+        self._connected = True
+        if self.cookie_jar is not None:
+            loaded = self.cookie_jar.load(self.session.cookies)
+            if loaded:
+                print(f"[OK] Reusing {loaded} cookies of the previous session")
+                return
+
         # Load cookies from Chrome browser
         self._load_browser_cookies()
-        
-        # Set realistic headers to mimic a real browser
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9,fr;q=0.8,nl;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-            'DNT': '1',
-            'Referer': 'https://www.immoweb.be/',
-        })
-        
+
         # Visit homepage first to get cookies and establish session
         self._establish_session()
-    
+        if self.cookie_jar is not None:
+            self.cookie_jar.save(self.session.cookies)
+
     def _load_browser_cookies(self):
         """
         Load cookies from browser (Chrome, Firefox, Edge) to make requests look more authentic.
         Tries multiple browsers in order of preference.
         """
+        import browser_cookie3
+
         browsers = [
             ('Chrome', browser_cookie3.chrome),
             ('Edge', browser_cookie3.edge),
@@ -117,17 +202,53 @@ class Immoweb_Scraper:
         """
         try:
             print("Establishing session with Immoweb...")
+            self.rate.acquire()
+            start = time.monotonic()
             response = self.session.get('https://www.immoweb.be', timeout=15, allow_redirects=True)
+            # The rate controller spaces the next request, like a human would
+            self.rate.observe(response.status_code, time.monotonic() - start, response.headers.get("Retry-After"))
             if response.status_code == 200:
                 print("[OK] Session established successfully")
-                # Wait a bit to simulate human behavior
-                time.sleep(random.uniform(2, 4))
             else:
                 print(f"Warning: Homepage returned status {response.status_code}")
         except Exception as e:
             print(f"Warning: Could not establish session: {e}")
             print("Continuing anyway...")
 
+    def fetch_page(self, url):
+        """
+        Fetch a page with the scraper's session, cache, rate controller and metrics.
+
+        Args:
+        - url (str): URL to fetch.
+
+        Returns:
+        - bytes: Response body, or None if the URL could not be fetched.
+        """
+        return fetch(self.session, url, cache=self.cache, rate=self.rate, metrics=self.metrics)
+
+    def async_fetcher(self):
+        """
+        Returns:
+        - AsyncFetcher: Fetcher sharing the scraper's session, cache, rate controller and metrics.
+        """
+        return AsyncFetcher(self.session, max_per_host=self.concurrency, cache=self.cache, rate=self.rate,
+                            pool_size=self.pool_size, http2=self.http2, metrics=self.metrics)
+
+    def parse_page(self, url, content):
+        """
+        Parse a detail page with parse_classified, timing it.
+
+        Args:
+        - url (str): URL of the classified.
+        - content (bytes): Raw HTML of the page.
+
+        Returns:
+        - dict: Scraped record, or None if the page cannot be parsed.
+        """
+        with self.metrics.parse_time.time(page="classified"):
+            return parse_classified(url, content, self.element_list, self.use_payload)
+
     def get_base_urls(self):
         """
         Get the list of base URLs after applying the filter.
@@ -153,173 +274,204 @@ class Immoweb_Scraper:
         Returns:
         - list: List of Immoweb URLs.
         """
-        # Add random delay to appear more human-like (longer delay for first requests)
-        time.sleep(random.uniform(2, 5))
-        
-        # Update referer to make it look like we're navigating from the site
-        self.session.headers.update({
-            'Referer': 'https://www.immoweb.be/',
-        })
-        
-        max_retries = 3
-        url_content = None
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, timeout=15, allow_redirects=True)
-                
-                # Check if we got blocked
-                if response.status_code == 403:
-                    if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 5 + random.uniform(2, 5)
-                        print(f"Got 403 for {url}, waiting {wait_time:.1f}s before retry {attempt + 1}/{max_retries}")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"Error accessing {url}: 403 Forbidden (blocked after {max_retries} attempts)")
-                        return []
-                
-                response.raise_for_status()
-                url_content = response.content
-                break
-            except requests.exceptions.RequestException as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 3 + random.uniform(1, 3)
-                    print(f"Error accessing {url} (attempt {attempt + 1}/{max_retries}): {e}, retrying in {wait_time:.1f}s")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Error accessing {url}: {e} (failed after {max_retries} attempts)")
-                    return []
-        
+        self.ensure_session()
+        # The default headers already carry the site as Referer, to make it look like we're navigating from the site
+        # The rate controller spaces requests to appear more human-like
+        url_content = self.fetch_page(url)
+
         # If we couldn't get the content, return empty list
         if url_content is None:
             return []
 
-        lst = []
-        soup = BeautifulSoup(url_content, "lxml")
-        
-        # Try multiple selectors to find property links
-        selectors = [
-            ("a", {"class": "card__title-link"}),
-            ("a", {"class": "card-title-link"}),
-            ("a", {"class": "search-result__title-link"}),
-            ("a", {"class": "property-link"}),
-            ("a", {"class": lambda x: x and "card" in x.lower() and "link" in x.lower()}),
-        ]
-        
-        # First, try finding links by href pattern (most reliable method)
-        for tag in soup.find_all("a", href=True):
-            href = tag.get("href", "")
-            if not href:
-                continue
-                
-            # Normalize href
-            if href.startswith("/"):
-                href = f"https://www.immoweb.be{href}"
-            elif not href.startswith("http"):
-                continue
-                
-            # Check if it's a property URL
-            if ("www.immoweb.be" in href or "immoweb.be" in href) and \
-               ("/property/" in href or "/en/classified/" in href or "/fr/classified/" in href or "/nl/classified/" in href) and \
-               "new-real-estate-project" not in href:
-                lst.append(href)
-        
-        # Try the specific class selectors
-        for tag_name, attrs in selectors:
-            try:
-                for tag in soup.find_all(tag_name, attrs=attrs):
-                    immoweb_url = tag.get("href")
-                    if immoweb_url:
-                        if immoweb_url.startswith("/"):
-                            immoweb_url = f"https://www.immoweb.be{immoweb_url}"
-                        if ("www.immoweb.be" in immoweb_url or "immoweb.be" in immoweb_url) and \
-                           "new-real-estate-project" not in immoweb_url:
-                            lst.append(immoweb_url)
-            except Exception as e:
-                # Skip if selector fails
-                continue
+        links = self.extract_immoweb_urls(url, url_content)
+        if self.journal is not None:
+            self.journal.search_page(url, links)
+        return links
+
+    def extract_immoweb_urls(self, url, url_content):
+        """
+        Extract the property URLs from the content of a search page.
 
-        # Ensure only unique URLs are returned
-        unique_urls = list(set(lst))
-        if unique_urls:
-            print(f"Found {len(unique_urls)} URLs from {url}")
+        Args:
+        - url (str): Base URL the content was fetched from.
+        - url_content (bytes): HTML of the search page.
+
+        Returns:
+        - list: List of Immoweb URLs.
+        """
+        # One pass over the anchors, see scraper.links. /en/, /fr/ and /nl/ variants
+        # of a classified count once
+        with self.metrics.parse_time.time(page="search"):
+            found = extract_property_links(url_content)
+        if self.listings is not None:
+            self.listings.update(search_listings(url_content, found))
+        if found:
+            print(f"Found {len(found)} URLs from {url}")
         else:
             print(f"Warning: No URLs found from {url}. The page structure may have changed.")
-        return unique_urls
+        return found
 
+    @_stage
     def get_immoweb_urls_thread(self):
+        self.ensure_session()
         self.base_urls_list = self.get_base_urls()
+        base_urls = self.base_urls_list
+        if self.journal is not None and self.journal.search_pages:
+            # Search pages completed before the interruption are not fetched again
+            base_urls = []
+            for url in self.base_urls_list:
+                if url in self.journal.search_pages:
+                    self.immoweb_urls_list.extend(self.journal.search_pages[url])
+                else:
+                    base_urls.append(url)
+            print(f"{len(self.base_urls_list) - len(base_urls)} search pages restored from the journal")
+
+        if self.concurrency > 1:
+            print(f'Generating urls (async mode, {self.concurrency} concurrent requests per host)')
+            fetcher = self.async_fetcher()
+            contents = fetcher.fetch_all(base_urls)
+            for url, url_content in zip(base_urls, contents):
+                if url_content is not None:
+                    links = self.extract_immoweb_urls(url, url_content)
+                    if self.journal is not None:
+                        self.journal.search_page(url, links)
+                    self.immoweb_urls_list.extend(links)
+            return self._dedupe_immoweb_urls()
+
         # Use sequential requests instead of threading to avoid being blocked
         # Immoweb seems to block concurrent requests
         print('Generating urls (sequential mode to avoid blocking)')
-        for url in self.base_urls_list:
+        for url in base_urls:
             result = self.get_immoweb_url(url)
             if result:
                 print(f"Found {len(result)} URLs from page")
             self.immoweb_urls_list.extend(result)
-        print(f"Total URLs collected: {len(self.immoweb_urls_list)}")
+        return self._dedupe_immoweb_urls()
+
+    def _dedupe_immoweb_urls(self):
+        # A classified listed on several search pages is only fetched once
+        collected = len(self.immoweb_urls_list)
+        self.immoweb_urls_list = unique_urls(self.immoweb_urls_list)
+        self.metrics.dedup_hits.inc(collected - len(self.immoweb_urls_list), stage="url")
+        print(f"Total URLs collected: {len(self.immoweb_urls_list)} ({collected - len(self.immoweb_urls_list)} duplicates dropped)")
+        print(f"Request rate: {self.rate.status()}")
         return self.immoweb_urls_list
 
+    def select_urls_to_fetch(self, urls):
+        """
+        In incremental mode, keep only the classifieds that are new or due for a refresh.
+
+        Args:
+        - urls (list): Immoweb URLs found on the search pages.
+
+        Returns:
+        - list: Immoweb URLs whose detail page must be fetched.
+        """
+        if self.seen_filter is not None:
+            known = len(urls)
+            urls = [url for url in urls if property_key(url) not in self.seen_filter]
+            print(f"Seen filter: {known - len(urls)} classifieds already scraped by a previous run are skipped")
+        if self.index is None:
+            return urls
+        self.index.mark_seen(urls)
+        selected = self.index.select_for_fetch(urls, self.refresh_after)
+        print(f"Incremental mode: {len(selected)} of {len(urls)} classifieds are new or due for a refresh")
+        return selected
+
+    def split_resumed(self, urls):
+        """
+        Separate the classifieds already parsed according to the journal from the ones to fetch.
+
+        Args:
+        - urls (list): Immoweb URLs found on the search pages.
+
+        Returns:
+        - tuple: (records restored from the journal, URLs still to fetch)
+        """
+        if self.journal is None or not self.journal.records:
+            return [], urls
+        records = [self.journal.records[url] for url in urls if url in self.journal.records]
+        urls = [url for url in urls if url not in self.journal.records]
+        print(f"{len(records)} records restored from the journal")
+        return records, urls
+
+    def split_listed(self, urls):
+        """
+        Separate the classifieds whose record was built from a search page from the ones to fetch.
+
+        Args:
+        - urls (list): Immoweb URLs to scrape.
+
+        Returns:
+        - tuple: ((url, record) pairs built from the search pages, URLs whose detail page must be fetched)
+        """
+        listed = [(url, self.listings[url]) for url in urls if url in self.listings]
+        urls = [url for url in urls if url not in self.listings]
+        print(f"Listings mode: {len(listed)} records read from the search pages, {len(urls)} detail pages to fetch")
+        return listed, urls
+
+    @_stage
     def create_soup_thread(self):
+        from bs4 import BeautifulSoup
+
         print('Creating Soups')
         self.c=0
         self.soups = []
-        self.immoweb_urls_list = self.get_immoweb_urls_thread()
+        self.immoweb_urls_list = self.select_urls_to_fetch(self.get_immoweb_urls_thread())
         
         if not self.immoweb_urls_list:
             print("No URLs to process. Skipping soup creation.")
             return []
         
+        if self.concurrency > 1:
+            print(f'Creating soups (async mode, {self.concurrency} concurrent requests per host)')
+            fetcher = self.async_fetcher()
+            for content in fetcher.fetch_all(self.immoweb_urls_list):
+                self.soups.append(BeautifulSoup(content, "lxml") if content is not None else None)
+            print(f"Created {sum(soup is not None for soup in self.soups)} soup objects out of {len(self.immoweb_urls_list)} URLs")
+            return self.soups
+
         # Use sequential requests instead of threading to avoid being blocked
         print('Creating soups (sequential mode to avoid blocking)')
         for url in self.immoweb_urls_list:
-            soup = self.create_soup(url, self.session)
-            if soup is not None:
-                self.soups.append(soup)
-        print(f"Created {len(self.soups)} soup objects out of {len(self.immoweb_urls_list)} URLs")
+            # Failed pages stay as None so that soups line up with immoweb_urls_list
+            self.soups.append(self.create_soup(url, self.session))
+        print(f"Created {sum(soup is not None for soup in self.soups)} soup objects out of {len(self.immoweb_urls_list)} URLs")
         return self.soups
     
     def create_soup(self, url, session):
+        self.ensure_session()
         self.c += 1
         print(f'{self.c} Soup objects created')
-        # Add random delay to appear more human-like
-        time.sleep(random.uniform(0.5, 2))
-        
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = session.get(url, timeout=15, allow_redirects=True)
-                
-                # Check if we got blocked
-                if response.status_code == 403:
-                    if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 5 + random.uniform(2, 5)
-                        print(f"Got 403 for {url}, waiting {wait_time:.1f}s before retry {attempt + 1}/{max_retries}")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"Error accessing {url}: 403 Forbidden (blocked after {max_retries} attempts)")
-                        return None
-                
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, "lxml")
-                return soup
-            except requests.exceptions.RequestException as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 3 + random.uniform(1, 3)
-                    print(f"Error accessing {url} (attempt {attempt + 1}/{max_retries}): {e}, retrying in {wait_time:.1f}s")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Error accessing {url}: {e} (failed after {max_retries} attempts)")
-                    return None
+        # The rate controller spaces requests to appear more human-like
+        content = fetch(session, url, cache=self.cache, rate=self.rate, metrics=self.metrics)
+        if content is None:
+            return None
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(content, "lxml")
 
+    @_stage
     def scrape_table_dataset(self):
         """
         Scrape data from Immoweb URLs.
         
         Returns:
-        - list: List of dictionaries containing scraped data.
+        - RecordBuffer: Scraped records (data_set).
         """
+        if (self.parse_workers or self.journal is not None or self.listings is not None or self.pipeline
+                or self.use_payload):
+            # Raw pages go straight to the parser (processes), no soup is built here, and
+            # each record reaches the journal as soon as its page is parsed
+            if self.parse_workers:
+                print(f'Scraping in progress ({self.parse_workers} parser processes)')
+            else:
+                print('Scraping in progress (journaled)')
+            for result in self.iter_records():
+                self.add_record(result)
+            print(f"Scraped {len(self.data_set)} properties")
+            return self.data_set
+
         self.soups = self.create_soup_thread()
         # Filter out None soups and corresponding URLs
         valid_pairs = [(url, soup) for url, soup in zip(self.immoweb_urls_list, self.soups) if soup is not None]
@@ -330,12 +482,179 @@ class Immoweb_Scraper:
         # Use sequential processing to avoid being blocked
         print('Scraping in progress (sequential mode)')
         for url, soup in valid_pairs:
-            result = self.process_url(url, soup)
-            if result and result not in self.data_set:  # Check for duplicates before appending
-                self.data_set.append(result)
+            with self.metrics.parse_time.time(page="classified"):
+                result = self.process_url(url, soup)
+            if result:
+                self._record_scraped(url, result)
+                self.add_record(result)
+        self._finish_scraping()
         print(f"Scraped {len(self.data_set)} properties")
         return self.data_set
 
+    def iter_pages(self, urls):
+        """
+        Fetch detail pages one after the other, or concurrently in async mode.
+
+        Args:
+        - urls (list): Immoweb URLs to fetch.
+
+        Yields:
+        - tuple: (url, content) as each page arrives, content is None for failures.
+        """
+        self.ensure_session()
+        if self.concurrency > 1:
+            fetcher = self.async_fetcher()
+            yield from fetcher.iter_fetch(urls)
+            return
+        for url in urls:
+            yield url, self.fetch_page(url)
+
+    def iter_records(self):
+        """
+        Yield one record per detail page as soon as the page has been fetched and parsed.
+
+        Only one parsed page is alive at a time, so memory does not grow with
+        the number of pages.
+
+        Yields:
+        - dict: Scraped record.
+        """
+        if self.pipeline:
+            yield from self.iter_pipeline_records()
+            return
+        resumed, urls = self.split_resumed(self.get_immoweb_urls_thread())
+        for record in resumed:
+            self.metrics.records.inc(source="journal")
+            # Records buffered for the store or not yet in the raw dataset may have
+            # been lost with the interrupted run
+            if self.store is not None:
+                self.store.write(record)
+            if self.index is not None:
+                self.index.record_fetched(record)
+            yield record
+        urls = self.select_urls_to_fetch(urls)
+        if self.listings is not None:
+            listed, urls = self.split_listed(urls)
+            for url, record in listed:
+                self._record_scraped(url, record, source="listing")
+                yield record
+        if not urls:
+            print("No URLs to process.")
+            self._finish_scraping()
+            return
+        pages = ((url, content) for url, content in self.iter_pages(urls) if content is not None)
+        if self.parse_workers:
+            with ParsePool(self.parse_workers, self.element_list, use_payload=self.use_payload) as pool:
+                yield from self._collect_records(pool.imap(pages))
+        else:
+            # The tree only lives inside parse_classified, so it is freed before the next page
+            yield from self._collect_records(
+                (url, self.parse_page(url, content)) for url, content in pages
+            )
+
+    def iter_pipeline_records(self):
+        """
+        Yield the records of a crawl whose search pages and detail pages are fetched at the same time.
+
+        Detail pages are parsed here, as they come out of the pipeline.
+
+        Yields:
+        - dict: Scraped record.
+        """
+        print(f'Crawling search and detail pages at the same time ({max(1, self.concurrency)} detail fetches)')
+        with CrawlPipeline(self, workers=self.concurrency) as pipeline:
+            for kind, url, item in pipeline:
+                if kind == "resumed":
+                    self.metrics.records.inc(source="journal")
+                    # Records buffered for the store or not yet in the raw dataset may have
+                    # been lost with the interrupted run
+                    if self.store is not None:
+                        self.store.write(item)
+                    if self.index is not None:
+                        self.index.record_fetched(item)
+                    yield item
+                    continue
+                if kind == "page":
+                    if item is None:
+                        continue
+                    print(url)
+                    item = self.parse_page(url, item)
+                if item:
+                    self._record_scraped(url, item, source="listing" if kind == "record" else "detail")
+                    yield item
+        self._finish_scraping()
+
+    def _collect_records(self, parsed):
+        for url, record in parsed:
+            print(url)
+            if record:
+                self._record_scraped(url, record)
+                yield record
+        self._finish_scraping()
+
+    def _record_scraped(self, url, record, source="detail"):
+        self.metrics.records.inc(source=source)
+        if self.index is not None:
+            self.index.record_fetched(record)
+        if self.journal is not None:
+            self.journal.record(url, record)
+        if self.store is not None:
+            self.store.write(record)
+        if self.seen_filter is not None:
+            self.seen_filter.add(property_key(url))
+
+    def _finish_scraping(self):
+        print(f"Request rate: {self.rate.status()}")
+        if self.cookie_jar is not None and self._connected:
+            # Keep the cookies the site set during the crawl for the next run
+            self.cookie_jar.save(self.session.cookies)
+        if self.store is not None:
+            self.store.flush()
+
+    def add_record(self, result):
+        """
+        Append a record to data_set unless an identical record is already there.
+
+        Same rule as checking `result not in self.data_set`, but with a hash of
+        each record instead of comparing against every earlier record.
+
+        Args:
+        - result (dict): Scraped record.
+
+        Returns:
+        - bool: True if the record was appended.
+        """
+        if not self.data_set.append(result):
+            self.metrics.dedup_hits.inc(stage="record")
+            return False
+        return True
+
+    @_stage
+    def scrape_table_dataset_stream(self, sink):
+        """
+        Scrape data from Immoweb URLs and write each record straight to a sink.
+
+        Unlike scrape_table_dataset, neither soups nor records are kept in memory.
+
+        Args:
+        - sink: Object with a write(record) method, e.g. scraper.sinks.CsvSink.
+
+        Returns:
+        - int: Number of records written.
+        """
+        print('Scraping in progress (streaming mode)')
+        seen_ids = set()
+        written = 0
+        for record in self.iter_records():
+            if record["Property ID"] in seen_ids:
+                self.metrics.dedup_hits.inc(stage="record")
+                continue
+            seen_ids.add(record["Property ID"])
+            sink.write(record)
+            written += 1
+        print(f"Scraped {written} properties")
+        return written
+
     def process_url(self, each_url, soup):
         """
         Process each URL to scrape data.
@@ -357,7 +676,7 @@ class Immoweb_Scraper:
         print(each_url)
         try:
             for tag in soup.find("div", attrs={"id": "classified-description-content-text"}).find_all("p"):
-                if any(keyword in tag.text.lower() for keyword in ["open haard", "cheminée", "feu ouvert", "open fire"]):
+                if any(keyword in tag.text.lower() for keyword in OPEN_FIRE_KEYWORDS):
                     data_dict["Open Fire"] = 1
                 else:
                     data_dict["Open Fire"] = 0
@@ -373,432 +692,176 @@ class Immoweb_Scraper:
         except: 
             data_dict["Price"] = 0
         
+        wanted = set(self.element_list)
         for tag in soup.find_all("tr"):
             for tag1 in tag.find_all("th", attrs={"class": "classified-table__header"}):
-                if tag1.string is not None:
-                    for element in self.element_list:
-                        if element == tag1.string.strip():
-                            tag_text = str(tag.td).strip().replace("\n", "").replace(" ", "")
-                            start_loc = tag_text.find('>')
-                            end_loc = tag_text.find('<', tag_text.find('<') + 1)
-                            data_dict[element] = tag_text[start_loc + 1:end_loc]
+                if tag1.string is None:
+                    continue
+                element = tag1.string.strip()
+                if element in wanted:
+                    tag_text = str(tag.td).strip().replace("\n", "").replace(" ", "")
+                    start_loc = tag_text.find('>')
+                    end_loc = tag_text.find('<', tag_text.find('<') + 1)
+                    data_dict[element] = tag_text[start_loc + 1:end_loc]
         return data_dict
 
+    @_stage
     def update_dataset(self):
         """
-        Missing information on webpage is populated as 0
+        Missing information on webpage is populated as None
         Example : If the information regarding swimming pool is not on webpage then
-        in the dataset Swimming pull will be updated to 0
-        """
-        for each_dict in self.data_set:
-            dict_elem = []
-            for each_element in each_dict:
-                dict_elem.append(each_element)
-            for each_value in self.element_list:
-                if each_value not in dict_elem:
-                    each_dict[each_value] = None
+        in the dataset Swimming pool will be None
+
+        data_set holds every column of the schema, a missing field already reads as None.
+        """
         return self.data_set
 
+    @_stage
     def Raw_DataFrame(self):
         """ 
-        Convert the data_set list of dict into a DataFrame 
+        Convert the data_set records into a DataFrame, one column per column buffer
         """
-        self.data_set_df = pd.DataFrame(self.data_set)
+        self.data_set_df = self.data_set.to_frame()
         return self.data_set_df
 
-    def to_csv_raw(self):
+    @_stage
+    def to_csv_raw(self, background=False):
         """ 
         Convert the data_set DataFrame into CSV 
+
+        The DataFrame written to the file is kept in raw_df, so that it can be
+        handed to Clean_DataFrame without reading the file back.
+
+        Args:
+        - background (bool): Write the file in a background thread, so that cleaning can start meanwhile.
+          The write is its own stage, write_raw_csv. Ignored with a profiler, which follows one thread.
+
+        Returns:
+        - concurrent.futures.Future: The write when background is True, whose result() waits for it and
+          raises its error, None otherwise.
         """
-        if len(self.data_set) == 0:
+        import pandas as pd
+
+        csv_path = 'data/raw_data/data_set_RAW.csv'
+        if self.index is not None or self.seen_filter is not None:
+            # Incremental mode and the seen filter only scraped new or outdated classifieds:
+            # merge them into the previous raw dataset, the fresh record winning
+            self.raw_df = self._merge_raw_csv(csv_path)
+        elif len(self.data_set) == 0:
             print('Warning: No data to save. Creating empty CSV file.')
             # Create empty DataFrame with expected columns
-            empty_df = pd.DataFrame(columns=["url", "Property ID", "Locality name", "Postal code", "Subtype of property", "Open Fire", "Price"] + self.element_list)
-            empty_df.to_csv('data/raw_data/data_set_RAW.csv', index=False)
+            self.raw_df = pd.DataFrame(columns=self.raw_columns)
         else:
-            self.data_set_df.to_csv('data/raw_data/data_set_RAW.csv', index=False)
-        print('A .csv file called "data_set_RAW.csv" has been generated. ')
-
+            self.raw_df = self.data_set_df
+        if background and self.profiler is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=1)
+            writer = executor.submit(self.write_raw_csv, self.raw_df, csv_path)
+            # The thread ends with the write
+            executor.shutdown(wait=False)
+            return writer
+        self.write_raw_csv(self.raw_df, csv_path)
+        return None
+
+    @_stage
+    def write_raw_csv(self, frame, csv_path):
+        """
+        Write the raw dataset and commit what depends on it being saved.
 
-    def Clean_DataFrame(self):
+        Args:
+        - frame (pd.DataFrame): Raw dataset, raw_df.
+        - csv_path (str): Raw CSV.
+        """
+        frame.to_csv(csv_path, index=False)
+        print('A .csv file called "data_set_RAW.csv" has been generated. ')
+        if self.index is not None:
+            # The fetched classifieds are only skipped by the next runs once saved
+            self.index.commit_fetched()
+        if self.seen_filter is not None:
+            self.seen_filter.save(self.seen_filter_path)
+
+    def _merge_raw_csv(self, csv_path):
+        import pandas as pd
+
+        frames = []
+        if os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
+            frames.append(pd.read_csv(csv_path, dtype=str))
+        if len(self.data_set) > 0:
+            frames.append(self.data_set_df.astype(str).where(self.data_set_df.notna()))
+        if not frames:
+            print('Warning: No data to save. Creating empty CSV file.')
+            return pd.DataFrame(columns=self.raw_columns)
+        merged = pd.concat(frames, ignore_index=True)
+        merged = merged.drop_duplicates(subset=['Property ID'], keep='last')
+        print(f'{len(self.data_set)} new or refreshed properties merged into {len(merged)} known properties')
+        return merged
+
+    @_stage
+    def Clean_DataFrame(self, raw_df=None, workers=1):
         """
         Allow to convert the data_set list of dict in a DataFrame
         Allow to clean the DataFrame (inner aggregation, conversion, renaming )
 
+        Args:
+        - raw_df (pd.DataFrame): Raw dataset to clean in memory, e.g. raw_df after to_csv_raw.
+          By default the raw dataset is read back from data_set_RAW.csv.
+        - workers (int): Number of processes cleaning blocks of rows, None for the number of cores.
+          The result is the same as with 1, see scraper.parallel_cleaning.
         """
-        import os
+        import pandas as pd
+
+        from scraper.cleaning import clean_dataframe, raw_dtypes
+        from scraper.parallel_cleaning import clean_dataframe_parallel
+
         csv_path = "data/raw_data/data_set_RAW.csv"
-        
-        # Check if file exists and is not empty
-        if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
-            print("Warning: No data to clean. The raw data file is empty or does not exist.")
-            self.data_set_df = pd.DataFrame()
-            return self.data_set_df
-        
-        try:
-            self.data_set_df = pd.read_csv(csv_path, delimiter=',')
-            
-            # Check if DataFrame is empty
-            if len(self.data_set_df) == 0:
+
+        if raw_df is not None:
+            # Same dtypes as read_csv would infer, without the serialize/parse round trip
+            self.data_set_df = raw_dtypes(raw_df)
+            if len(self.data_set_df) > 0:
+                print(self.data_set_df.head())
+                print(f"Number of rows before cleaning: {len(self.data_set_df)}")
+        else:
+            # Check if file exists and is not empty
+            if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+                print("Warning: No data to clean. The raw data file is empty or does not exist.")
+                self.data_set_df = pd.DataFrame()
+                return self.data_set_df
+
+            try:
+                self.data_set_df = pd.read_csv(csv_path, delimiter=',')
+
+                # Check if DataFrame is empty
+                if len(self.data_set_df) == 0:
+                    print("Warning: The raw data file is empty. Nothing to clean.")
+                    return self.data_set_df
+
+                print(self.data_set_df.head())
+                print(f"Number of rows before cleaning: {len(self.data_set_df)}")
+            except pd.errors.EmptyDataError:
                 print("Warning: The raw data file is empty. Nothing to clean.")
+                self.data_set_df = pd.DataFrame()
                 return self.data_set_df
-                
-            print(self.data_set_df.head())
-            print(f"Number of rows before cleaning: {len(self.data_set_df)}")
-        except pd.errors.EmptyDataError:
-            print("Warning: The raw data file is empty. Nothing to clean.")
-            self.data_set_df = pd.DataFrame()
-            return self.data_set_df
-        
+
         # Check if DataFrame is empty after reading
         if len(self.data_set_df) == 0:
             print("Warning: No data to clean. The DataFrame is empty.")
             return self.data_set_df
         
-        #drop duplicate based of property id
-        if 'Property ID' in self.data_set_df.columns:
-            self.data_set_df = self.data_set_df.drop_duplicates(subset=['Property ID'])
+        if workers == 1:
+            self.data_set_df = clean_dataframe(self.data_set_df)
         else:
-            print("Warning: 'Property ID' column not found. Skipping duplicate removal.")
-      
-     
-
-        # suppress wrong postal code
-        if 'Postal code' in self.data_set_df.columns:
-            condition_to_delete = self.data_set_df['Postal code'].astype(str).str.len() < 5
-            #condition_to_delete = ((self.data_set_df['Postal code'].str.contains('%')) | (len(self.data_set_df['Postal code']) > 4))
-            #condition_to_delete = (self.data_set_df['Postal code'].astype(str).str.isdigit()) | (self.data_set_df['Postal code'].astype(str).str.len() > 4)
-
-            self.data_set_df = self.data_set_df[~condition_to_delete]  # Keep rows where postal code length >= 5
-            self.data_set_df = self.data_set_df.reset_index(drop=True)
-        else:
-            print("Warning: 'Postal code' column not found. Skipping postal code filtering.")
-      
-        
-
-        # replacements of ugly pattern
-        if 'Locality name' in self.data_set_df.columns:
-            patterns_to_search = [re.escape('?'), '%C3%8B','%28','%29', '%27','%20', '%C3%A8', '%C3%8A', '%C3%AA', '%C3%88', '%C3%89', '%C3%A9', '%C3%A0', '%C3%A2', '%C3%82', '%C3%80','%C3%BB']
-            replacements = [' ', 'e','','',' ', ' ', 'e', 'e','e', 'e','e', 'e', 'a', 'a', 'a','a', 'u', ]
-            for pattern, replacement in zip(patterns_to_search, replacements):
-                condition_to_replace = self.data_set_df['Locality name'].str.contains(pattern, na=False)
-                self.data_set_df.loc[condition_to_replace, 'Locality name'] = self.data_set_df.loc[condition_to_replace, 'Locality name'].str.replace(pattern, replacement)
-        else:
-            print("Warning: 'Locality name' column not found. Skipping pattern replacement.")
-     
-
-
-
-        #to convert the Price in a number format 
-        self.data_set_df["Price"] = self.data_set_df["Price"].astype(str).str.replace(",", "")
-
-        
-        
-        #to ensure that numeric to be column are containing numeric data
-        col_to_conv = [
-            "Property ID",
-            "Postal code",
-            "Open Fire",
-            "Price",
-            "Construction year",
-            "Number of frontages",
-            "Covered parking spaces",
-            "Outdoor parking spaces",
-            "Living area",
-            "Bedrooms",
-            "Bathrooms",
-            "Surface of the plot",
-            "Garden surface",
-            "Terrace surface",
-            "Shower rooms",
-        ]
-        for col in col_to_conv:
-            if col in self.data_set_df.columns:
-                
-                self.data_set_df[col] = pd.to_numeric(self.data_set_df[col], downcast='integer', errors='coerce')
-        
-
-        #appartment or house classification creation
-        self.data_set_df["Type of property"] = self.data_set_df[
-            "Subtype of property"
-        ].apply(
-            lambda x: None
-            if pd.isnull(x)
-            else (
-                "Apartment"
-                if x
-                in [
-                    "apartment",
-                    "loft",
-                    "penthouse",
-                    "duplex",
-                    "ground-floor",
-                    "flat-studio",
-                    "service-flat",
-                    "kot",
-                    "triplex",
-                ]
-                else "House"
-            )
-        )
-
-
-        #New columns creation (arithmetic or spatial aggregation)
-        self.data_set_df["Parking tot nb"] = (self.data_set_df["Covered parking spaces"].fillna(0) + self.data_set_df["Outdoor parking spaces"].fillna(0))
-        self.data_set_df["Bathrooms total nb"] = (self.data_set_df["Bathrooms"].fillna(0) + self.data_set_df["Shower rooms"].fillna(0))
-
-        def province(dfval):
-            if pd.isna(dfval):
-                return None
-            postal_codes = [range(1000,1300), range(1300, 1500), range(1500,1990), range(3000,3500), range(2000,3000), range(3500,4000), range(4000,5000), range(5000,6000), range(6000,6600), range(7000,8000), range(6600,7000), range(8000,9000), range(9000,10000)]
-            provinces = ['Brussels Hoofdstedelijk Gewest', 'Waals-Brabant', 'Vlaams-Brabant', 'Vlaams-Brabant', 'Antwerpen', 'Limburg', 'Luik', 'Namen','Henegouwen', 'Henegouwen','Luxemburg', 'West-Vlaanderen', 'Oost-Vlaanderen']
-            for pc_range, prov in zip(postal_codes, provinces):
-                if dfval in pc_range:
-                    return prov
-            return None
-        self.data_set_df['province'] = self.data_set_df['Postal code'].apply(lambda x: province(x))
-
-
-        def region(dfval):
-            if pd.isna(dfval):
-                return None
-            if dfval in range(1300,1500) or dfval in range(4000,7000):
-                return 'Wallonia'
-            elif dfval in range(1000,1300):
-                return 'Brussels'
-            else:
-                return 'Flanders'
-        self.data_set_df['region'] = self.data_set_df['Postal code'].apply(lambda x: region(x))
-
-        
-        #quali>quanti transformatiion : to create boolean output for all columns where it is possibile 
-        #through direct converion (yes/no -0/1) or through aggregation 
-            
-
-        self.data_set_df["New Construction boolean"] = self.data_set_df[
-            "Construction year"
-        ].apply(lambda x: None if pd.isnull(x) else (0 if x < 2021 else 1))
-
-        self.data_set_df["Tenement building boolean"] = self.data_set_df[
-            "Tenement building"
-        ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
-
-        self.data_set_df["Building condition boolean"] = self.data_set_df[
-            "Building condition"
-        ].apply(
-            lambda x: None
-            if pd.isnull(x)
-            else (1 if x in ["Asnew", "Good", "Justrenovated"] else 0)
-        )
-
-        self.data_set_df["Flood safe boolean"] = self.data_set_df[
-            "Flood zone type"
-        ].apply(lambda x: None if pd.isnull(x) else (1 if x == "Nonfloodzone" else 0))
-
-        self.data_set_df["Furnished boolean"] = self.data_set_df[
-            "Furnished"
-        ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
-
-      
-        self.data_set_df["Kitchen equipped boolean"] = self.data_set_df[
-            "Kitchen type"
-        ].apply(
-            lambda x: None
-            if pd.isnull(x)
-            else (0 if x in ["Notinstalled", "USAuninstalled"] else 1)
-        )
-
-        self.data_set_df["Energy class boolean"] = self.data_set_df[
-            "Energy class"
-        ].apply(
-            lambda x: None
-            if pd.isnull(x) or x =='Notspecified'
-            else (1 if x in ["A", "A+","A++", "B"] else 0)
-        )
-        self.data_set_df["Terrace boolean"] = self.data_set_df["Terrace surface"].apply(
-            lambda x: 0 if pd.isnull(x) else (1 if x > 0 else 0)
-        )
-
-        self.data_set_df["Swimming pool boolean"] = self.data_set_df[
-            "Swimming pool"
-        ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
-
-        self.data_set_df["Garden boolean"] = self.data_set_df["Garden surface"].apply(
-            lambda x: 0 if pd.isnull(x) else (1 if x > 0 else 0)
-        )
-        
-        self.data_set_df["Parking boolean"] = self.data_set_df["Parking tot nb"].apply(
-            lambda x: None if pd.isnull(x) else (1 if x > 0 else 0)
-        )
-        
-        self.data_set_df["Bathrooms total nb boolean"] = self.data_set_df["Bathrooms total nb"].apply(
-            lambda x: None if pd.isnull(x) else (1 if x > 1 else 0)
-        )
-
-        self.data_set_df["Elevator boolean"] = self.data_set_df["Elevator"].apply(
-            lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0)
-        )
-
-        self.data_set_df["Accessible for disabled people boolean"] = self.data_set_df[
-            "Accessible for disabled people"
-        ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
-
-        self.data_set_df["Double glazing boolean"] = self.data_set_df[
-            "Double glazing"
-        ].apply(lambda x: None if pd.isnull(x) else (1 if x.lower() == "yes" else 0))
-
-
-         #text reformating in a more readable way 
-
-        replace_dict1 = {
-            "Asnew": "As new",
-            "Justrenovated": "Just renovated",
-            "Tobedoneup": "To be done",
-            "Torenovate": "To renovate",
-            "Torestore" : "To restore"
-        }
-        replace_dict2 = {
-            "Hyperequipped": "Hyper equipped",
-            "Semiequipped": "Semi equipped",
-            "USAhyperequipped": "USA hyper equipped",
-            "Notinstalled": "Not installed",
-            "USAinstalled": "USA installed",
-            "USAsemiequipped": "USA semi-equipped",
-            "USAuninstalled" : "USA uninstalled"
-        }
-        replace_dict3 = {"Fueloil": "Fuel oil"}
-
-        replace_dict4 = {
-            "Nonfloodzone": "Non flood zone",
-            "Circumscribedzone": "Circumscribed zone",
-            "Possiblecircumscribedwatersidezone": "Possible circumscribed waterside zone",
-            "Possiblefloodzone": "Possible flood zone",
-            "Recognizedfloodzone": "Recognized flood zone",
-            "Propertypartiallyorcompletelylocatedinacircumscribedandrecognizedfloodzone": "Property partially or completely located in a circumscribed and recognized flood zone",
-            "Propertypartiallyorcompletelylocatedinacircumscribedfloodzone" : "Property partially or completely located in a circumscribed flood zone",
-            "Propertypartiallyorcompletelylocatedinapossiblefloodzoneandlocatedinacircumscribedwatersidezone" : "Property partially or completely located in a possible flood zone and located in a circumscribed waterside zone", 
-    }
-
-        replace_dict5 = {"Notspecified": "Not specified"}
-
-        self.data_set_df["Building condition"] = self.data_set_df[
-            "Building condition"
-        ].replace(replace_dict1)
-
-        self.data_set_df["Kitchen type"] = self.data_set_df["Kitchen type"].replace(
-            replace_dict2
-        )
-        self.data_set_df["Heating type"] = self.data_set_df["Heating type"].replace(
-            replace_dict3
-        )
-        self.data_set_df["Flood zone type"] = self.data_set_df["Flood zone type"].replace(
-            replace_dict4
-        )
-        self.data_set_df["Energy class"] = self.data_set_df["Energy class"].replace(
-            replace_dict5
-        )
-        
-
-        # column renaming for clarity
-
-        self.data_set_df = self.data_set_df.rename(
-            columns={
-                "url": "URL",
-                "Price": "Price (euro)",
-                "Surface of the plot": "Plot surface (sqm)",
-                "Open Fire": "Open fire",
-                "Locality name": "Locality",
-                "Subtype of property": "Subtype",
-                "Living area": "Living surface (sqm)",
-                "Bedrooms": "Nb of Bedrooms",
-                "Terrace surface": "Terrace surface (sqm)",
-                "Garden surface": "Garden surface (sqm)",
-            }
-        )
-  
-         #Column final Reordering
-
-        new_col_order = [
-            "Locality",
-            "province",
-            "region",
-            "Postal code",
-            "Type of property",
-            "Subtype",
-            "Price (euro)",
-            "Construction year",
-            "New Construction boolean",
-            "Building condition boolean",
-            "Building condition",
-            "Energy class boolean",
-            "Energy class",
-            "Heating type",
-            "Double glazing boolean",
-            "Double glazing",
-            "Elevator boolean",
-            "Elevator",
-            "Accessible for disabled people boolean",
-            "Accessible for disabled people",
-            "Living surface (sqm)",
-            "Furnished boolean",
-            "Furnished",
-            "Nb of Bedrooms",
-            "Bathrooms total nb boolean",
-            "Bathrooms total nb",
-            "Bathrooms",
-            "Shower rooms",
-            "Kitchen equipped boolean",
-            "Kitchen type",
-            "Open fire",
-            "Number of frontages",
-            "Swimming pool boolean",
-            "Swimming pool",
-            "Plot surface (sqm)",
-            "Terrace boolean",
-            "Terrace surface (sqm)",
-            "Garden boolean",
-            "Garden surface (sqm)",
-            "Parking boolean",
-            "Parking tot nb",
-            "Covered parking spaces",
-            "Outdoor parking spaces",
-            "Flood safe boolean",
-            "Flood zone type",
-            "Tenement building boolean",
-            "Tenement building",
-            "URL",
-            "Property ID",
-        ]
-        self.data_set_df = self.data_set_df[new_col_order]
-
-        self.data_set_df = self.data_set_df.round(0)
-
-        # Drop outliers
-
-        Q75 = self.data_set_df['Price (euro)'].quantile(0.75)
-        Q25 = self.data_set_df['Price (euro)'].quantile(0.25)
-        iqr = Q75- Q25
-        upper = Q75 + (1.5 * iqr)
-        lower = Q25 - (1.5 * iqr)
-
-        self.data_set_df = self.data_set_df[(self.data_set_df['Price (euro)'] > lower) & (self.data_set_df['Price (euro)'] < upper)]
-
-        Q75 = self.data_set_df['Plot surface (sqm)'].quantile(0.75)
-        Q25 = self.data_set_df['Plot surface (sqm)'].quantile(0.25)
-        iqr = Q75- Q25
-        upper = Q75 + (1.5 * iqr)
-        lower = Q25 - (1.5 * iqr)
-
-        self.data_set_df = self.data_set_df[(self.data_set_df['Plot surface (sqm)'] > lower) & (self.data_set_df['Plot surface (sqm)'] < upper)]
-        self.data_set_df['Locality'] = self.data_set_df['Locality'].str.capitalize()
-        self.data_set_df['Price (sqm)'] = self.data_set_df['Price (euro)'] / self.data_set_df['Living surface (sqm)']
+            self.data_set_df = clean_dataframe_parallel(self.data_set_df, workers)
 
         print(self.data_set_df.head(10))
         print("DataFrame is cleaned!")
         return self.data_set_df 
 
 
+    @_stage
     def to_csv_clean(self):
+        import pandas as pd
          
         #Convert the data_set DataFrame into CSV 
         
@@ -810,3 +873,55 @@ class Immoweb_Scraper:
         else:
             self.data_set_df.to_csv('data/clean_data/data_set_CLEAN.csv', index=False)
         print('A .csv file called "data_set_CLEAN.csv" has been generated. ')
+
+    @_stage
+    def clean_csv_chunked(self, chunksize=100_000):
+        """
+        Clean data_set_RAW.csv chunk by chunk into data_set_CLEAN.csv, for raw datasets that do not fit in memory.
+
+        Replaces Clean_DataFrame and to_csv_clean, see scraper.chunked_cleaning.
+
+        Args:
+        - chunksize (int): Rows read at a time.
+
+        Returns:
+        - int: Number of clean rows written.
+        """
+        from scraper.chunked_cleaning import clean_csv_chunked
+
+        return clean_csv_chunked("data/raw_data/data_set_RAW.csv", "data/clean_data/data_set_CLEAN.csv", chunksize)
+
+    @_stage
+    def to_parquet_raw(self):
+        """
+        Convert the raw dataset into a Parquet file, string columns dictionary-encoded
+        """
+        import pandas as pd
+
+        from scraper.cleaning import raw_dtypes
+        from scraper.columnar import write_dataset
+
+        csv_path = 'data/raw_data/data_set_RAW.csv'
+        if self.raw_df is not None:
+            raw_df = raw_dtypes(self.raw_df)
+        elif os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
+            # Streaming mode: the records only went to the raw CSV
+            raw_df = pd.read_csv(csv_path)
+        else:
+            print('Warning: No raw data to save as Parquet.')
+            return
+        write_dataset(raw_df, 'data/raw_data/data_set_RAW.parquet')
+        print('A Parquet file called "data_set_RAW.parquet" has been generated. ')
+
+    @_stage
+    def to_parquet_clean(self):
+        """
+        Convert the cleaned DataFrame into a Parquet dataset partitioned by region and province
+        """
+        from scraper.columnar import PARTITION_COLUMNS, write_dataset
+
+        if len(self.data_set_df) == 0:
+            print('Warning: No cleaned data to save as Parquet.')
+            return
+        write_dataset(self.data_set_df, 'data/clean_data/data_set_CLEAN.parquet', partition_cols=PARTITION_COLUMNS)
+        print('A Parquet dataset called "data_set_CLEAN.parquet" has been generated. ')
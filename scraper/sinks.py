@@ -0,0 +1,46 @@
+import csv
+import os
+
+
+class CsvSink:
+    """
+    Append scraped records to a CSV file as soon as they are produced.
+
+    Every row has the same columns; fields missing from a record are written
+    empty, like the None values added by update_dataset.
+    """
+
+    def __init__(self, path, columns) -> None:
+        """
+        Initialize the CsvSink object and write the header.
+
+        Args:
+        - path (str): CSV file to create.
+        - columns (list): Column names, in output order.
+        """
+        self.path = path
+        self.columns = columns
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, restval="", extrasaction="ignore", lineterminator="\n")
+        self._writer.writeheader()
+
+    def write(self, record):
+        """
+        Write one record.
+
+        Args:
+        - record (dict): Scraped record.
+        """
+        self._writer.writerow(record)
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
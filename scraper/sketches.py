@@ -0,0 +1,107 @@
+"""
+Streaming quantile sketch, for the outlier bounds of datasets that do not fit in memory.
+"""
+import numpy as np
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty) of a stream of numbers.
+
+    Values go into a hierarchy of compactors: when a level holds more than
+    its capacity, it is sorted and every other value moves up one level,
+    where it stands for twice as many values. The memory stays in
+    O(k log(n / k)) values whatever the size n of the stream, and the rank
+    error of a quantile is about 1.7 / k of n.
+
+    As long as fewer than k values were added nothing is compacted, and
+    quantile() is the exact linear interpolation of pandas / numpy.
+    """
+
+    def __init__(self, k=2048, seed=0) -> None:
+        """
+        Initialize the KLLSketch object.
+
+        Args:
+        - k (int): Capacity of the top level. Higher is more accurate.
+        - seed (int): Seed of the random offsets of the compactions, so that a run can be repeated.
+        """
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        """
+        Add values, NaN are ignored as by Series.quantile.
+
+        Args:
+        - values (array-like): Numbers to add.
+        """
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # An odd value out stays at this level
+                kept, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        """
+        Add the values summarized by another sketch.
+
+        Args:
+        - other (KLLSketch): Sketch of another part of the stream.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, q):
+        """
+        Args:
+        - q (float): Quantile, between 0 and 1.
+
+        Returns:
+        - float: Estimated quantile, linearly interpolated like Series.quantile. NaN when the sketch is empty.
+        """
+        if not self.count:
+            return np.nan
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype="int64")
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        # Rank of the last value each item stands for
+        ranks = np.cumsum(weights[order]) - 1
+        # Compacted items stand for a total that can be off by a few from count
+        position = q * (ranks[-1])
+        below = np.floor(position)
+        a = values[np.searchsorted(ranks, below)]
+        b = values[np.searchsorted(ranks, min(below + 1, ranks[-1]))]
+        t = position - below
+        # Same formula as numpy's linear interpolation
+        if t >= 0.5:
+            return float(b - (b - a) * (1 - t))
+        return float(a + (b - a) * t)
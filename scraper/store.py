@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import time
+
+from scraper.constants import APARTMENT_SUBTYPES
+
+
+def _integer(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PropertyStore:
+    """
+    SQLite inventory of every classified scraped so far, keyed on Property ID.
+
+    Each record is upserted with the columns downstream jobs filter on
+    (postal code, price, type of property, first/last seen times), which are
+    indexed, next to the full record as JSON. Records are buffered and
+    written in batches, one transaction per batch.
+    """
+
+    def __init__(self, path="data/properties.sqlite", batch_size=500) -> None:
+        """
+        Initialize the PropertyStore object.
+
+        Args:
+        - path (str): SQLite database file.
+        - batch_size (int): Number of buffered records written per transaction.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._apartment_subtypes = frozenset(APARTMENT_SUBTYPES)
+        self._pending = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS properties (
+                property_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                locality TEXT,
+                postal_code INTEGER,
+                property_type TEXT,
+                subtype TEXT,
+                price INTEGER,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS properties_postal_code ON properties (postal_code);
+            CREATE INDEX IF NOT EXISTS properties_price ON properties (price);
+            CREATE INDEX IF NOT EXISTS properties_type ON properties (property_type, subtype);
+            CREATE INDEX IF NOT EXISTS properties_last_seen ON properties (last_seen);
+        """)
+        self._db.commit()
+
+    def _row(self, record, now):
+        subtype = record.get("Subtype of property")
+        price = _integer(record.get("Price"))
+        return (
+            str(record["Property ID"]),
+            record["url"],
+            record.get("Locality name"),
+            _integer(record.get("Postal code")),
+            None if subtype is None else ("Apartment" if subtype in self._apartment_subtypes else "House"),
+            subtype,
+            price or None,  # 0 means the price was not displayed
+            now,
+            now,
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    def write(self, record):
+        """
+        Buffer a record, writing the buffer once it holds batch_size records.
+
+        Args:
+        - record (dict): Scraped record.
+        """
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def upsert(self, records):
+        """
+        Insert or update records in one transaction, the latest record of a Property ID winning.
+
+        Args:
+        - records (iterable): Scraped records.
+        """
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO properties (property_id, url, locality, postal_code, property_type, subtype, price, "
+                "first_seen, last_seen, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(property_id) DO UPDATE SET url = excluded.url, locality = excluded.locality, "
+                "postal_code = excluded.postal_code, property_type = excluded.property_type, "
+                "subtype = excluded.subtype, price = excluded.price, last_seen = excluded.last_seen, "
+                "record = excluded.record",
+                [self._row(record, now) for record in records],
+            )
+
+    def flush(self):
+        if self._pending:
+            self.upsert(self._pending)
+            self._pending = []
+
+    def query(self, postal_codes=None, min_price=None, max_price=None, property_type=None, seen_since=None):
+        """
+        Select stored records, filtering on the indexed columns.
+
+        Args:
+        - postal_codes (tuple): (first, last) postal code range, bounds included.
+        - min_price (int): Minimum price.
+        - max_price (int): Maximum price.
+        - property_type (str): "House" or "Apartment".
+        - seen_since (float): Only classifieds last seen on a search page after this timestamp.
+
+        Returns:
+        - list: Matching records.
+        """
+        self.flush()
+        conditions, params = [], []
+        if postal_codes is not None:
+            conditions.append("postal_code BETWEEN ? AND ?")
+            params.extend(postal_codes)
+        if min_price is not None:
+            conditions.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+        if property_type is not None:
+            conditions.append("property_type = ?")
+            params.append(property_type)
+        if seen_since is not None:
+            conditions.append("last_seen >= ?")
+            params.append(seen_since)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._db.execute(f"SELECT record FROM properties{where} ORDER BY property_id", params)
+        return [json.loads(row[0]) for row in rows]
+
+    def __len__(self):
+        self.flush()
+        return self._db.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,78 @@
+from types import MappingProxyType
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+POOL_SIZE = 10
+
+# Realistic headers to mimic a real browser. They are set once per session
+# and never mutated afterwards, so sessions can be shared by concurrent fetches
+DEFAULT_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9,fr;q=0.8,nl;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+    'DNT': '1',
+    'Referer': 'https://www.immoweb.be/',
+})
+
+
+def build_session(pool_size=POOL_SIZE):
+    """
+    Create the requests session shared by the sequential fetches.
+
+    Connections (and their TLS sessions) are kept alive and reused from a
+    pool of pool_size connections per host; when all of them are busy a
+    request waits for one instead of opening a throwaway connection.
+
+    Args:
+    - pool_size (int): Number of pooled connections per host.
+
+    Returns:
+    - requests.Session: Session with the default headers.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.clear()
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def async_client(session, pool_size=POOL_SIZE, http2=False):
+    """
+    Create the httpx client of the async fetches, with the headers and cookies of a session.
+
+    Args:
+    - session (requests.Session): Session whose headers and cookies are reused.
+    - pool_size (int): Maximum number of connections, all kept alive between requests.
+    - http2 (bool): Multiplex the requests to a host over one HTTP/2 connection. Needs the h2
+      package, the client falls back to HTTP/1.1 without it.
+
+    Returns:
+    - httpx.AsyncClient: Client to use as an async context manager.
+    """
+    import httpx
+
+    options = dict(
+        headers=dict(session.headers),
+        cookies=session.cookies,
+        timeout=15,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=30),
+    )
+    if http2:
+        try:
+            return httpx.AsyncClient(http2=True, **options)
+        except ImportError:
+            print("Warning: HTTP/2 needs the h2 package (pip install 'httpx[http2]'), using HTTP/1.1")
+    return httpx.AsyncClient(**options)
@@ -0,0 +1,170 @@
+import hashlib
+import math
+import os
+import struct
+from urllib.parse import urlsplit, urlunsplit
+
+
+IMMOWEB_HOST = "www.immoweb.be"
+
+
+def canonical_url(url):
+    """
+    Normalize a classified URL: absolute https URL on www.immoweb.be, without query string,
+    fragment nor trailing slash.
+
+    Args:
+    - url (str): Classified URL as found in a search page.
+
+    Returns:
+    - str: Canonical URL.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host in ("", "immoweb.be"):
+        host = IMMOWEB_HOST
+    return urlunsplit(("https", host, parts.path.rstrip("/"), "", ""))
+
+
+def property_key(url):
+    """
+    Key identifying a classified whatever the variant of its URL.
+
+    /en/, /fr/ and /nl/ pages of a classified, with or without query string,
+    all end with its Property ID.
+
+    Args:
+    - url (str): Classified URL.
+
+    Returns:
+    - str: Property ID, or the canonical URL if the URL does not end with one.
+    """
+    segment = urlsplit(url.strip()).path.rstrip("/").rsplit("/", 1)[-1]
+    if segment.isdigit():
+        return segment
+    return canonical_url(url)
+
+
+def unique_urls(urls, seen=None):
+    """
+    Canonicalize URLs and keep one of each classified: its /en/ variant when one is
+    among urls, else the first one.
+
+    The subtype of a record is read from its URL, so a /fr/ or /nl/ variant would
+    give a localized one (maison, huis). A classified already in seen is left out,
+    whatever the variant that was kept for it.
+
+    Args:
+    - urls (iterable): Classified URLs.
+    - seen (set): Keys of the classifieds already kept, updated in place.
+
+    Returns:
+    - list: Canonical URLs, in their original order.
+    """
+    seen = set() if seen is None else seen
+    kept = []
+    # Position in kept of the classifieds kept without their /en/ variant
+    localized = {}
+    for url in urls:
+        key = property_key(url)
+        url = canonical_url(url)
+        english = urlsplit(url).path.startswith("/en/")
+        if key not in seen:
+            seen.add(key)
+            if not english:
+                localized[key] = len(kept)
+            kept.append(url)
+        elif english and key in localized:
+            kept[localized.pop(key)] = url
+    return kept
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set of classified keys, persisted across runs.
+
+    A key that was added is always reported as present; a key that was not
+    is wrongly reported present with probability error_rate once capacity
+    keys were added. 5 million keys at 0.1% take about 9 MB.
+    """
+
+    _HEADER = struct.Struct("<4sQQQ")
+    _MAGIC = b"IWBF"
+
+    def __init__(self, capacity=5_000_000, error_rate=0.001) -> None:
+        """
+        Initialize the BloomFilter object.
+
+        Args:
+        - capacity (int): Number of keys the filter is sized for.
+        - error_rate (float): False positive rate at capacity.
+        """
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """
+        Args:
+        - key (str): Classified key, see property_key.
+        """
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self):
+        return self.count
+
+    def save(self, path):
+        """
+        Write the filter to a file, atomically.
+
+        Args:
+        - path (str): Filter file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._HEADER.pack(self._MAGIC, self.size, self.hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, capacity=5_000_000, error_rate=0.001):
+        """
+        Read a filter written by save, or create an empty one.
+
+        Args:
+        - path (str): Filter file.
+        - capacity (int): Capacity of a new filter.
+        - error_rate (float): False positive rate of a new filter.
+
+        Returns:
+        - BloomFilter: Loaded or new filter.
+        """
+        bloom = cls(capacity, error_rate)
+        if not os.path.exists(path):
+            return bloom
+        with open(path, "rb") as f:
+            magic, size, hashes, count = cls._HEADER.unpack(f.read(cls._HEADER.size))
+            bits = bytearray(f.read())
+        if magic != cls._MAGIC or len(bits) != (size + 7) // 8:
+            print(f"Warning: {path} is not a valid seen filter, starting a new one.")
+            return bloom
+        bloom.size, bloom.hashes, bloom.count, bloom.bits = size, hashes, count, bits
+        return bloom
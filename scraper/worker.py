@@ -0,0 +1,203 @@
+"""
+Distributed crawl: workers sharing one work queue (see scraper.workqueue).
+
+Seed the queue with the search pages once, start workers on as many
+processes and machines as wanted, then export the merged dataset:
+
+    python -m scraper.worker seed --pages 50
+    python -m scraper.worker run --processes 4
+    python -m scraper.worker export
+
+--queue selects the queue, an SQLite file (default data/work_queue.sqlite)
+or a redis:// URL shared by several machines. Each worker process keeps its
+own adaptive rate controller: run --processes N splits --max-rate between
+them, give each machine its share when running on several.
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+
+from scraper.workqueue import CLASSIFIED, SEARCH, open_queue
+
+
+DEFAULT_QUEUE = "data/work_queue.sqlite"
+
+
+def seed(queue, numpages):
+    """
+    Put the search pages of a crawl into the queue.
+
+    Args:
+    - queue: Work queue.
+    - numpages (int): Number of pages to scrape, as entered in main.py.
+
+    Returns:
+    - int: Number of search pages added.
+    """
+    from scraper.scraper import Immoweb_Scraper
+
+    return queue.put(SEARCH, Immoweb_Scraper(numpages + 1, connect=False).get_base_urls())
+
+
+def process_task(scraper, queue, task):
+    """
+    Fetch and process one leased task.
+
+    A search page adds the classifieds found on it to the queue (with their
+    record directly when the scraper is in listings mode); a classified page
+    adds its record to the results.
+
+    Args:
+    - scraper (Immoweb_Scraper): Scraper whose session, cache and rate controller are used.
+    - queue: Work queue.
+    - task (Task): Leased task.
+
+    Returns:
+    - bool: True if the task is done, False if the page could not be fetched.
+    """
+    scraper.ensure_session()
+    content = scraper.fetch_page(task.url)
+    if content is None:
+        return False
+    if task.kind == SEARCH:
+        urls = scraper.extract_immoweb_urls(task.url, content)
+        if scraper.listings is not None:
+            listed, urls = scraper.split_listed(urls)
+            scraper.metrics.records.inc(len(listed), source="listing")
+            queue.add_results(record for _, record in listed)
+        queue.put(CLASSIFIED, urls)
+    else:
+        print(task.url)
+        record = scraper.parse_page(task.url, content)
+        if record:
+            scraper.metrics.records.inc(source="detail")
+            queue.add_results([record])
+    return True
+
+
+def work(scraper, queue, worker=None, idle_wait=2.0):
+    """
+    Process tasks until the queue has none left pending or leased.
+
+    Args:
+    - scraper (Immoweb_Scraper): Scraper doing the fetching and parsing.
+    - queue: Work queue.
+    - worker (str): Name of the worker. Defaults to host:pid.
+    - idle_wait (float): Seconds to wait when every remaining task is leased by other workers.
+
+    Returns:
+    - int: Number of tasks done by this worker.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    while True:
+        tasks = queue.lease(worker)
+        if not tasks:
+            if queue.finished():
+                break
+            # Other workers hold the remaining tasks, theirs come back if they die
+            time.sleep(idle_wait)
+            continue
+        for task in tasks:
+            if process_task(scraper, queue, task):
+                if queue.ack(task):
+                    done += 1
+                else:
+                    # The lease expired meanwhile: another worker has the task, its results are merged anyway
+                    print(f"Lease of {task.url} expired before it was done, the task was handed out again")
+            else:
+                queue.release(task)
+    scraper._finish_scraping()
+    print(f"Worker {worker} done: {done} tasks")
+    return done
+
+
+def _worker_process(queue_spec, options):
+    from scraper.scraper import Immoweb_Scraper
+
+    with open_queue(queue_spec) as queue:
+        work(Immoweb_Scraper(1, **options), queue)
+
+
+def run(queue_spec, processes=1, **options):
+    """
+    Run workers in local processes until the queue is finished.
+
+    Args:
+    - queue_spec (str): SQLite file or Redis URL of the queue.
+    - processes (int): Number of worker processes.
+    - options: Immoweb_Scraper arguments of the workers. max_rate is split between the processes.
+    """
+    options["max_rate"] = options.get("max_rate", 2.0) / processes
+    workers = [multiprocessing.Process(target=_worker_process, args=(queue_spec, options)) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+
+def export(queue, output_format="csv"):
+    """
+    Write the merged records of the queue as the raw and clean datasets, as main.py does.
+
+    Args:
+    - queue: Work queue.
+    - output_format (str): "csv" or "parquet".
+
+    Returns:
+    - Immoweb_Scraper: Offline scraper holding the datasets.
+    """
+    from scraper.scraper import Immoweb_Scraper
+
+    scraper = Immoweb_Scraper(1, connect=False)
+    for record in queue.results():
+        scraper.add_record(record)
+    print(f"{len(scraper.data_set)} records in the queue")
+    scraper.update_dataset()
+    scraper.Raw_DataFrame()
+    scraper.to_csv_raw()
+    scraper.Clean_DataFrame(raw_df=scraper.raw_df)
+    if output_format == "parquet":
+        scraper.to_parquet_raw()
+        scraper.to_parquet_clean()
+    else:
+        scraper.to_csv_clean()
+    return scraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed Immoweb crawl over a shared work queue.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE, help="SQLite file or redis:// URL of the work queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_parser = commands.add_parser("seed", help="Put the search pages into the queue")
+    seed_parser.add_argument("--pages", type=int, required=True, help="Number of pages to scrape (max 333)")
+    run_parser = commands.add_parser("run", help="Process tasks until the queue is finished")
+    run_parser.add_argument("--processes", type=int, default=1, help="Number of local worker processes")
+    run_parser.add_argument("--max-rate", type=float, default=2.0,
+                            help="Requests per second of this machine, split between its processes")
+    run_parser.add_argument("--cache-dir", default="data/cache", help="Directory of the on-disk response cache")
+    run_parser.add_argument("--listings", action="store_true",
+                            help="Take the records of search results that have every summary field from the search pages")
+    run_parser.add_argument("--use-payload", action="store_true",
+                            help="Fill the numeric fields missing from the table of a detail page with its JSON payload")
+    export_parser = commands.add_parser("export", help="Write the merged records as the raw and clean datasets")
+    export_parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    commands.add_parser("status", help="Print the number of tasks per status")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args.queue, args.processes, max_rate=args.max_rate, cache_dir=args.cache_dir, listings=args.listings,
+            use_payload=args.use_payload, cookie_jar_path="data/cookies.json")
+        return
+    with open_queue(args.queue) as queue:
+        if args.command == "seed":
+            print(f"{seed(queue, args.pages)} search pages added to {args.queue}")
+        elif args.command == "export":
+            export(queue, args.format)
+        print(f"Tasks: {queue.counts()}")
+
+
+if __name__ == "__main__":
+    main()
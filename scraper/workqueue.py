@@ -0,0 +1,402 @@
+"""
+Shared work queue of a distributed crawl.
+
+Search pages and classified pages are tasks. A worker leases tasks, which
+then stay invisible to the other workers until the lease expires; it
+acknowledges each task once done. A task whose worker died is leased again
+when its lease expires, up to max_attempts times. Parsed records are upserted
+on their Property ID, so the workers' results merge into one deduplicated
+dataset.
+
+SqliteWorkQueue keeps everything in one SQLite file, shared by the worker
+processes of a machine (or by machines over a network filesystem that
+supports SQLite locking). RedisWorkQueue has the same interface on top of
+any Redis-compatible server, for workers spread over several machines.
+"""
+import json
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+from scraper.urls import property_key
+
+
+Task = namedtuple("Task", ["key", "kind", "url", "attempts"])
+
+SEARCH = "search"
+CLASSIFIED = "classified"
+
+
+def task_key(kind, url):
+    """
+    Key of a task, the same for every URL variant of a classified.
+
+    Args:
+    - kind (str): SEARCH or CLASSIFIED.
+    - url (str): URL to fetch.
+
+    Returns:
+    - str: Task key.
+    """
+    return f"{kind}:{property_key(url) if kind == CLASSIFIED else url}"
+
+
+def open_queue(spec, **options):
+    """
+    Open the work queue described by a path or a Redis URL.
+
+    Args:
+    - spec (str): SQLite file, or redis:// / rediss:// URL.
+    - options: lease_seconds, max_attempts.
+
+    Returns:
+    - SqliteWorkQueue or RedisWorkQueue: Work queue.
+    """
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(spec, **options)
+    return SqliteWorkQueue(spec, **options)
+
+
+class SqliteWorkQueue:
+    """
+    Work queue in an SQLite file, safe to share between processes.
+    """
+
+    def __init__(self, path="data/work_queue.sqlite", lease_seconds=300, max_attempts=5) -> None:
+        """
+        Initialize the SqliteWorkQueue object.
+
+        Args:
+        - path (str): SQLite database file.
+        - lease_seconds (float): Time a worker has to acknowledge a leased task before it is handed out again.
+        - max_attempts (int): Number of leases of a task before it is given up.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Transactions are explicit, see lease()
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS tasks (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL,
+                worker TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until);
+            CREATE TABLE IF NOT EXISTS results (
+                property_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+        """)
+
+    def put(self, kind, urls):
+        """
+        Add tasks. A task already in the queue, whatever its status, is not added again.
+
+        Args:
+        - kind (str): SEARCH or CLASSIFIED.
+        - urls (iterable): URLs to fetch.
+
+        Returns:
+        - int: Number of tasks added.
+        """
+        rows = [(task_key(kind, url), kind, url) for url in urls]
+        with self._transaction():
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO tasks (key, kind, url) VALUES (?, ?, ?)", rows)
+            return self._db.total_changes - before
+
+    def lease(self, worker, limit=1):
+        """
+        Lease pending tasks, and tasks whose lease expired.
+
+        Args:
+        - worker (str): Name of the worker, for monitoring.
+        - limit (int): Maximum number of tasks.
+
+        Returns:
+        - list: Leased Task tuples, empty if none is available right now.
+        """
+        now = time.time()
+        with self._transaction():
+            # Tasks of a dead worker that were leased too many times are given up
+            self._db.execute(
+                "UPDATE tasks SET status = 'failed' WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            rows = self._db.execute(
+                "SELECT key, kind, url, attempts FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                "ORDER BY kind = 'classified' DESC, rowid LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_until = ?, worker = ? WHERE key = ?",
+                [(now + self.lease_seconds, worker, row[0]) for row in rows],
+            )
+        return [Task(key, kind, url, attempts + 1) for key, kind, url, attempts in rows]
+
+    def ack(self, task):
+        """
+        Mark a leased task as done, unless its lease expired and the task went back to the queue.
+
+        Args:
+        - task (Task): Task returned by lease.
+
+        Returns:
+        - bool: False for a stale ack: the task is pending, or leased again, and not marked done.
+        """
+        with self._transaction():
+            # Every lease adds an attempt, so the attempts tell this lease from a later one
+            cursor = self._db.execute(
+                "UPDATE tasks SET status = 'done', lease_until = NULL "
+                "WHERE key = ? AND status = 'leased' AND attempts = ?",
+                (task.key, task.attempts),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, task):
+        """
+        Hand a task that failed back to the queue, or give it up after max_attempts leases.
+
+        Args:
+        - task (Task): Task returned by lease.
+        """
+        status = "failed" if task.attempts >= self.max_attempts else "pending"
+        with self._transaction():
+            self._db.execute("UPDATE tasks SET status = ?, lease_until = NULL WHERE key = ?", (status, task.key))
+
+    def add_results(self, records):
+        """
+        Upsert parsed records on their Property ID.
+
+        Args:
+        - records (iterable): Scraped records.
+        """
+        rows = [(str(record["Property ID"]), record["url"], json.dumps(record, ensure_ascii=False))
+                for record in records]
+        with self._transaction():
+            self._db.executemany(
+                "INSERT INTO results (property_id, url, record) VALUES (?, ?, ?) "
+                "ON CONFLICT(property_id) DO UPDATE SET url = excluded.url, record = excluded.record",
+                rows,
+            )
+
+    def results(self):
+        """
+        Returns:
+        - list: Every record, one per Property ID.
+        """
+        return [json.loads(row[0]) for row in self._db.execute("SELECT record FROM results ORDER BY rowid")]
+
+    def counts(self):
+        """
+        Returns:
+        - dict: Number of tasks per status.
+        """
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+        return counts
+
+    def finished(self):
+        """
+        Returns:
+        - bool: True once no task is pending or leased.
+        """
+        counts = self.counts()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def _transaction(self):
+        return _Immediate(self._db)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _Immediate:
+    # BEGIN IMMEDIATE takes the write lock up front, so two processes can
+    # never select the same pending tasks in lease()
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+# Lua scripts run atomically on the server: a worker dying between two of
+# their commands cannot leave a task neither pending nor leased
+
+# KEYS: tasks, pending. ARGV: task key and payload of each task
+_PUT = """
+local added = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1]) == 1 then
+        redis.call('RPUSH', KEYS[2], ARGV[i])
+        added = added + 1
+    end
+end
+return added
+"""
+
+# KEYS: pending, leased, attempts, tasks. ARGV: lease expiry, limit
+_LEASE = """
+local tasks = {}
+for _ = 1, tonumber(ARGV[2]) do
+    local key = redis.call('LPOP', KEYS[1])
+    if not key then
+        break
+    end
+    redis.call('ZADD', KEYS[2], ARGV[1], key)
+    local attempts = redis.call('HINCRBY', KEYS[3], key, 1)
+    table.insert(tasks, {key, attempts, redis.call('HGET', KEYS[4], key)})
+end
+return tasks
+"""
+
+# KEYS: leased, attempts, pending, failed. ARGV: now, max_attempts
+_REQUEUE_EXPIRED = """
+for _, key in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])) do
+    redis.call('ZREM', KEYS[1], key)
+    if (tonumber(redis.call('HGET', KEYS[2], key)) or 0) >= tonumber(ARGV[2]) then
+        redis.call('SADD', KEYS[4], key)
+    else
+        redis.call('RPUSH', KEYS[3], key)
+    end
+end
+"""
+
+# KEYS: leased, attempts, done. ARGV: task key, attempts of the lease
+_ACK = """
+if tonumber(redis.call('HGET', KEYS[2], ARGV[1])) == tonumber(ARGV[2])
+        and redis.call('ZREM', KEYS[1], ARGV[1]) == 1 then
+    redis.call('SADD', KEYS[3], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# KEYS: leased, pending, failed. ARGV: task key, 1 to give the task up
+_RELEASE = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 1 then
+    if ARGV[2] == '1' then
+        redis.call('SADD', KEYS[3], ARGV[1])
+    else
+        redis.call('RPUSH', KEYS[2], ARGV[1])
+    end
+end
+"""
+
+
+class RedisWorkQueue:
+    """
+    Work queue on a Redis-compatible server (Redis, Valkey, KeyDB, ...), same interface as SqliteWorkQueue.
+
+    Pending task keys are in a list, leased ones in a sorted set scored by
+    lease expiry, and records in a hash keyed on the Property ID. A task
+    moves between the list and the sorted set in one Lua script, so it is
+    always either pending or leased.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", lease_seconds=300, max_attempts=5, prefix="immoweb") -> None:
+        """
+        Initialize the RedisWorkQueue object.
+
+        Args:
+        - url (str): Server URL.
+        - lease_seconds (float): Time a worker has to acknowledge a leased task before it is handed out again.
+        - max_attempts (int): Number of leases of a task before it is given up.
+        - prefix (str): Prefix of the keys, to run several crawls on one server.
+        """
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("The Redis work queue needs the redis package: pip install redis") from None
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._keys = {name: f"{prefix}:{name}" for name in
+                      ("tasks", "attempts", "pending", "leased", "done", "failed", "results")}
+        self._put = self._redis.register_script(_PUT)
+        self._lease = self._redis.register_script(_LEASE)
+        self._requeue = self._redis.register_script(_REQUEUE_EXPIRED)
+        self._ack = self._redis.register_script(_ACK)
+        self._release = self._redis.register_script(_RELEASE)
+
+    def put(self, kind, urls):
+        args = []
+        for url in urls:
+            args += [task_key(kind, url), json.dumps([kind, url])]
+        if not args:
+            return 0
+        return self._put(keys=[self._keys["tasks"], self._keys["pending"]], args=args)
+
+    def _requeue_expired(self):
+        keys = self._keys
+        self._requeue(keys=[keys["leased"], keys["attempts"], keys["pending"], keys["failed"]],
+                      args=[time.time(), self.max_attempts])
+
+    def lease(self, worker, limit=1):
+        self._requeue_expired()
+        keys = self._keys
+        leased = self._lease(keys=[keys["pending"], keys["leased"], keys["attempts"], keys["tasks"]],
+                             args=[time.time() + self.lease_seconds, limit])
+        tasks = []
+        for key, attempts, payload in leased:
+            kind, url = json.loads(payload)
+            tasks.append(Task(key, kind, url, int(attempts)))
+        return tasks
+
+    def ack(self, task):
+        keys = self._keys
+        return self._ack(keys=[keys["leased"], keys["attempts"], keys["done"]], args=[task.key, task.attempts]) == 1
+
+    def release(self, task):
+        keys = self._keys
+        self._release(keys=[keys["leased"], keys["pending"], keys["failed"]],
+                      args=[task.key, int(task.attempts >= self.max_attempts)])
+
+    def add_results(self, records):
+        mapping = {str(record["Property ID"]): json.dumps(record, ensure_ascii=False) for record in records}
+        if mapping:
+            self._redis.hset(self._keys["results"], mapping=mapping)
+
+    def results(self):
+        return [json.loads(value) for value in self._redis.hvals(self._keys["results"])]
+
+    def counts(self):
+        return {
+            "pending": self._redis.llen(self._keys["pending"]),
+            "leased": self._redis.zcard(self._keys["leased"]),
+            "done": self._redis.scard(self._keys["done"]),
+            "failed": self._redis.scard(self._keys["failed"]),
+        }
+
+    def finished(self):
+        counts = self.counts()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def close(self):
+        self._redis.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
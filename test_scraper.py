@@ -6,7 +6,7 @@ def test_scraper():
     numpages = 1
     
     start = time.time()
-    immoscrap = Immoweb_Scraper(numpages + 1)
+    immoscrap = Immoweb_Scraper(numpages + 1, cache_dir="data/cache")
     
     print("\n=== Step 1: Scraping table dataset ===")
     immoscrap.scrape_table_dataset()